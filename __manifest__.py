@@ -14,9 +14,14 @@
         'security/ir.model.access.csv',
         'security/lunch_security.xml',
         'data/lunch_email_data.xml',
+        'data/lunch_config_data.xml',
         'views/lunch_record_views.xml',
+        'views/lunch_record_archive_views.xml',
         'views/lunch_report_views.xml',
+        'views/lunch_cost_summary_views.xml',
+        'views/lunch_kitchen_count_views.xml',
         'views/lunch_email_views.xml',
+        'views/lunch_quick_confirm_templates.xml',
         'reports/lunch_report.xml',
     ],
     'external_dependencies': {
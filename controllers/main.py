@@ -0,0 +1,53 @@
+from odoo import http, exceptions, fields
+from odoo.http import request
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class LunchQuickConfirm(http.Controller):
+    """One-tap "confirm my lunch for tomorrow", without the full form and its chatter"""
+
+    @http.route('/lunch/confirm', type='http', auth='user', methods=['GET'])
+    def quick_confirm_page(self, **kwargs):
+        Record = request.env['lunch.record']
+        window = request.env['lunch.timing']._get_lunch_window()
+        return request.render('19_lunch_management.lunch_quick_confirm_page', {
+            'lunch': Record._get_my_next_day_record()._get_quick_confirm_values(),
+            'window': window and '%s - %s' % (Record._format_time(window.start_time), Record._format_time(window.end_time)),
+        })
+
+    @http.route('/lunch/confirm/status', type='jsonrpc', auth='user')
+    def quick_confirm_status(self):
+        started = time.perf_counter()
+        try:
+            result = request.env['lunch.record']._get_my_next_day_record()._get_quick_confirm_values()
+        except exceptions.UserError as e:
+            result = {'error': str(e)}
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    @http.route('/lunch/confirm/tomorrow', type='jsonrpc', auth='user')
+    def quick_confirm(self):
+        started = time.perf_counter()
+        try:
+            result = request.env['lunch.record']._quick_confirm_next_day()
+        except exceptions.UserError as e:
+            result = {'error': str(e)}
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        _logger.debug("Quick lunch confirm for uid %s took %sms", request.env.uid, result['elapsed_ms'])
+        return result
+
+
+class LunchKitchen(http.Controller):
+
+    @http.route('/lunch/kitchen/headcount', type='jsonrpc', auth='user')
+    def kitchen_headcount(self, date=None):
+        """Headcount per lunch type and location, read from the kitchen
+        counters; defaults to the next working day"""
+        started = time.perf_counter()
+        day = fields.Date.to_date(date) if date else request.env['lunch.record']._default_lunch_date()
+        result = request.env['lunch.kitchen.count']._get_headcount(day)
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return result
\ No newline at end of file
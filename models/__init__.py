@@ -3,4 +3,9 @@ from . import lunch_types
 from . import lunch_report
 from . import lunch_timing
 from . import lunch_email_scheduler
-from . import lunch_excel_import
\ No newline at end of file
+from . import lunch_excel_import
+from . import lunch_import_job
+from . import lunch_record_archive
+from . import lunch_cost_summary
+from . import lunch_kitchen_count
+from . import lunch_report_line
\ No newline at end of file
@@ -0,0 +1,77 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class LunchCostSummary(models.Model):
+    _name = 'lunch.cost.summary'
+    _description = 'Monthly Lunch Cost Summary'
+    _auto = False
+    _order = 'month desc, employee_id'
+    _rec_name = 'employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True)
+    department_id = fields.Many2one('hr.department', string='Department', readonly=True)
+    month = fields.Date(string='Month', readonly=True)
+    lunch_type = fields.Many2one('lunch.types', string='Lunch Type', readonly=True)
+    record_count = fields.Integer(string='Records', readonly=True,
+                                  help='Non-cancelled lunch records')
+    confirmed_count = fields.Integer(string='Confirmed', readonly=True)
+    total_cost = fields.Float(string='Total Cost', readonly=True,
+                              help='Cost of the confirmed lunch records')
+
+    def init(self):
+        """Materialized view: one row per employee, month and lunch type,
+        over the live and the archived lunch records.
+
+        It is refreshed by a scheduled action (and after imports) instead of
+        being aggregated from the raw lunch records on every read.
+        """
+        self.env.cr.execute("DROP MATERIALIZED VIEW IF EXISTS lunch_cost_summary")
+        self.env.cr.execute("""
+            CREATE MATERIALIZED VIEW lunch_cost_summary AS (
+                SELECT row_number() OVER (ORDER BY date_trunc('month', r.date), r.employee_id, r.lunch_type) AS id,
+                       r.employee_id AS employee_id,
+                       e.department_id AS department_id,
+                       date_trunc('month', r.date)::date AS month,
+                       r.lunch_type AS lunch_type,
+                       COUNT(*) AS record_count,
+                       COUNT(*) FILTER (WHERE r.state = 'confirmed') AS confirmed_count,
+                       COALESCE(SUM(r.cost) FILTER (WHERE r.state = 'confirmed'), 0.0) AS total_cost
+                  FROM (SELECT employee_id, date, lunch_type, state, cost FROM lunch_record
+                         UNION ALL
+                        SELECT employee_id, date, lunch_type, state, cost FROM lunch_record_archive) r
+                  JOIN hr_employee e ON e.id = r.employee_id
+                 WHERE r.state != 'cancelled'
+              GROUP BY r.employee_id, e.department_id, date_trunc('month', r.date), r.lunch_type
+            )
+        """)
+        # Required by REFRESH ... CONCURRENTLY, also serves the month filters
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX lunch_cost_summary_key
+                ON lunch_cost_summary (month, employee_id, lunch_type)
+        """)
+
+    @api.model
+    def _refresh(self):
+        """Recompute the summary without blocking readers"""
+        self.env['lunch.record'].flush_model()
+        self.env['lunch.record.archive'].flush_model()
+        self.env['hr.employee'].flush_model(['department_id'])
+        self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY lunch_cost_summary")
+        self.invalidate_model()
+        _logger.info("Lunch cost summary refreshed")
+
+    @api.model
+    def _trigger_refresh(self):
+        """Ask the refresh cron to run soon, e.g. after a bulk change"""
+        self.env.ref('19_lunch_management.cron_refresh_lunch_cost_summary')._trigger()
+
+    @api.model
+    def action_refresh(self):
+        self._refresh()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'reload',
+        }
\ No newline at end of file
@@ -1,7 +1,8 @@
 from odoo import models, fields, api
-from datetime import datetime, timedelta
-import pytz
+from odoo.tools import split_every
+from datetime import timedelta
 import logging
+import time
 
 _logger = logging.getLogger(__name__)
 
@@ -18,6 +19,29 @@ class LunchEmailScheduler(models.Model):
     is_active = fields.Boolean(string='Active', default=True)
     last_sent_date = fields.Date(string='Last Sent Date', readonly=True)
     
+    # Dispatch
+    dispatch_mode = fields.Selection([
+        ('immediate', 'Send Immediately'),
+        ('batched', 'Queue in Batches'),
+    ], string='Dispatch Mode', default='immediate', required=True,
+        help='Send Immediately renders and sends each email inside the scheduled action. '
+             'Queue in Batches renders all reminders in batches and leaves delivery to the mail queue.')
+    reminder_target = fields.Selection([
+        ('all', 'All Employees'),
+        ('missing', 'Only Employees Without a Record'),
+    ], string='Send To', default='all', required=True,
+        help='Only Employees Without a Record skips everyone who already has a '
+             'requested or confirmed lunch record for the next working day; '
+             'pre-generated drafts still get the reminder')
+    mail_batch_size = fields.Integer(string='Batch Size', default=500,
+                                     help='Number of reminders rendered and queued together')
+    
+    # Metrics of the last run
+    last_run_rendered = fields.Integer(string='Rendered', readonly=True)
+    last_run_queued = fields.Integer(string='Sent/Queued', readonly=True)
+    last_run_failed = fields.Integer(string='Failed', readonly=True)
+    last_run_elapsed = fields.Float(string='Elapsed (s)', readonly=True, digits=(16, 2))
+    
     _sql_constraints = [
         ('unique_scheduler', 'unique(name)', 'Only one scheduler configuration allowed!')
     ]
@@ -38,26 +62,29 @@ class LunchEmailScheduler(models.Model):
             _logger.info("Emails already sent today. Skipping...")
             return
         
-        # Get Nepal timezone and check current time
-        nepal_tz = pytz.timezone('Asia/Kathmandu')
-        now = datetime.now(nepal_tz)
-        current_hour = now.hour + (now.minute / 60.0)
+        # Current time in the lunch timezone
+        current_hour = self.env['lunch.timing']._current_hour()
         
         # Check if it's time to send (within 1 hour window)
         if not (scheduler.email_time <= current_hour <= scheduler.email_time + 1):
             _logger.info(f"Not time to send yet. Current: {current_hour}, Target: {scheduler.email_time}")
             return
         
-        # Get all active employees with email
-        employees = self.env['hr.employee'].search([
-            ('active', '=', True),
-            ('work_email', '!=', False)
-        ])
+        # Get the active employees with email to remind
+        employees = scheduler._get_reminder_employees()
         
         if not employees:
             _logger.warning("No employees with email found!")
             return
         
+        # Skip employees already served today by an earlier (interrupted) run
+        Log = self.env['lunch.reminder.log']
+        Log._vacuum_old_entries()
+        served_ids = set(Log.search([('run_date', '=', today)]).employee_id.ids)
+        if served_ids:
+            employees = employees.filtered(lambda employee: employee.id not in served_ids)
+            _logger.info(f"{len(served_ids)} employees already reminded today, {len(employees)} remaining")
+        
         # Get email template
         template = scheduler.email_template_id
         if not template:
@@ -65,38 +92,146 @@ class LunchEmailScheduler(models.Model):
             template = self._create_default_email_template()
             scheduler.email_template_id = template.id
         
-        # Get base URL
-        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        started = time.monotonic()
+        ctx = scheduler._get_reminder_context()
+        dispatch = (scheduler._dispatch_reminders_batched if scheduler.dispatch_mode == 'batched'
+                    else scheduler._dispatch_reminders_immediate)
+        totals = {'rendered': 0, 'queued': 0, 'failed': 0}
+        
+        # Commit after every chunk so a crash only loses the chunk in progress
+        for chunk_ids in split_every(scheduler.mail_batch_size or 500, employees.ids, list):
+            metrics = dispatch(employees.browse(chunk_ids), template, ctx)
+            Log.create([{
+                'run_date': today,
+                'employee_id': employee_id,
+                'scheduler_id': scheduler.id,
+            } for employee_id in metrics['served']])
+            for key in totals:
+                totals[key] += metrics[key]
+            self.env.cr.commit()
+        
+        # Update run metrics; the day is only closed once everyone was served,
+        # otherwise the next run retries the remainder
+        vals = {
+            'last_run_rendered': totals['rendered'],
+            'last_run_queued': totals['queued'],
+            'last_run_failed': totals['failed'],
+            'last_run_elapsed': time.monotonic() - started,
+        }
+        if not totals['failed']:
+            vals['last_sent_date'] = today
+        scheduler.write(vals)
         
-        sent_count = 0
-        failed_count = 0
+        _logger.info(
+            "Lunch reminder email process completed (%s). Rendered: %s, Sent/Queued: %s, Failed: %s, Elapsed: %.2fs",
+            scheduler.dispatch_mode, totals['rendered'], totals['queued'], totals['failed'],
+            scheduler.last_run_elapsed
+        )
+
+    def _get_reminder_employees(self):
+        """Employees to remind, according to the configured target"""
+        self.ensure_one()
+        if self.reminder_target != 'missing':
+            return self.env['hr.employee'].search([
+                ('active', '=', True),
+                ('work_email', '!=', False)
+            ])
+        
+        # Anti-join: active employees with an email and no requested or
+        # confirmed lunch record for the next working day, in a single query.
+        # Drafts do not count: the nightly cron pre-generates one for everyone
+        lunch_date = self.env['lunch.record']._default_lunch_date()
+        self.env['hr.employee'].flush_model(['active', 'work_email', 'name'])
+        self.env['lunch.record'].flush_model(['employee_id', 'date', 'state'])
+        self.env.cr.execute("""
+            SELECT e.id
+              FROM hr_employee e
+             WHERE e.active
+               AND COALESCE(e.work_email, '') != ''
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM lunch_record r
+                     WHERE r.employee_id = e.id
+                       AND r.date = %s
+                       AND r.state NOT IN ('draft', 'cancelled')
+               )
+          ORDER BY e.name, e.id
+        """, (lunch_date,))
+        employee_ids = [row[0] for row in self.env.cr.fetchall()]
+        _logger.info(f"{len(employee_ids)} employees have no requested or confirmed lunch for {lunch_date}")
+        return self.env['hr.employee'].browse(employee_ids)
+
+    def _get_reminder_context(self):
+        """Rendering context shared by all reminders of a run"""
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        return {
+            'tomorrow_date': self.env['lunch.timing']._next_working_day().strftime('%B %d, %Y'),
+            'lunch_url': f"{base_url}/web#action=19_lunch_management.action_lunch_record_my",
+        }
+
+    def _dispatch_reminders_immediate(self, employees, template, ctx):
+        """Render and send one email per employee, synchronously"""
+        metrics = {'rendered': 0, 'queued': 0, 'failed': 0, 'served': []}
         
         for employee in employees:
             try:
-                # Prepare context with employee-specific data
-                ctx = {
-                    'employee_name': employee.name,
-                    'tomorrow_date': (datetime.now() + timedelta(days=1)).strftime('%B %d, %Y'),
-                    'lunch_url': f"{base_url}/web#action=19_lunch_management.action_lunch_record_my",
-                }
-                
                 # Send email
-                template.with_context(ctx).send_mail(
+                template.with_context(ctx, employee_name=employee.name).send_mail(
                     employee.id,
                     force_send=True,
                     email_values={'email_to': employee.work_email}
                 )
-                sent_count += 1
+                metrics['rendered'] += 1
+                metrics['queued'] += 1
+                metrics['served'].append(employee.id)
                 _logger.info(f"Email sent to {employee.name} ({employee.work_email})")
                 
             except Exception as e:
-                failed_count += 1
+                metrics['failed'] += 1
                 _logger.error(f"Failed to send email to {employee.name}: {str(e)}")
         
-        # Update last sent date
-        scheduler.last_sent_date = today
+        return metrics
+
+    def _dispatch_reminders_batched(self, employees, template, ctx):
+        """Render reminders in one batch and queue them as mail.mail records.
+
+        The batch is rendered with a single template pass over the employee
+        ids and inserted with one ``create``; nothing is sent here, the mail
+        queue cron delivers the emails afterwards. The caller splits the
+        employees into batches of ``mail_batch_size``.
+        """
+        metrics = {'rendered': 0, 'queued': 0, 'failed': 0, 'served': []}
+        template = template.with_context(ctx)
+        Mail = self.env['mail.mail'].sudo()
+        
+        try:
+            rendered = template._generate_template(employees.ids, ('subject', 'body_html', 'email_from', 'reply_to'))
+        except Exception as e:
+            metrics['failed'] += len(employees)
+            _logger.error(f"Failed to render lunch reminders for {len(employees)} employees: {str(e)}")
+            return metrics
+        metrics['rendered'] += len(employees)
         
-        _logger.info(f"Lunch reminder email process completed. Sent: {sent_count}, Failed: {failed_count}")
+        try:
+            Mail.create([{
+                'subject': rendered[employee.id].get('subject'),
+                'body_html': rendered[employee.id].get('body_html'),
+                'email_from': rendered[employee.id].get('email_from'),
+                'reply_to': rendered[employee.id].get('reply_to'),
+                'email_to': employee.work_email,
+                'model': 'hr.employee',
+                'res_id': employee.id,
+                'auto_delete': template.auto_delete,
+            } for employee in employees])
+            metrics['queued'] += len(employees)
+            metrics['served'] += employees.ids
+        except Exception as e:
+            metrics['failed'] += len(employees)
+            _logger.error(f"Failed to queue lunch reminders for {len(employees)} employees: {str(e)}")
+        
+        if metrics['queued']:
+            self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
+        return metrics
 
     def _create_default_email_template(self):
         """Create default email template for lunch reminders"""
@@ -110,7 +245,7 @@ class LunchEmailScheduler(models.Model):
                         <h2 style="color: #2c3e50; margin-bottom: 20px;">🍽️ Lunch Reminder</h2>
                         
                         <p style="color: #34495e; font-size: 16px; line-height: 1.6;">
-                            Hello <strong>${ctx.get('employee_name', 'Employee')}</strong>,
+                            Hello <strong>${object.name}</strong>,
                         </p>
                         
                         <p style="color: #34495e; font-size: 16px; line-height: 1.6;">
@@ -161,7 +296,7 @@ class LunchEmailScheduler(models.Model):
         
         ctx = {
             'employee_name': employee.name,
-            'tomorrow_date': (datetime.now() + timedelta(days=1)).strftime('%B %d, %Y'),
+            'tomorrow_date': self.env['lunch.timing']._next_working_day().strftime('%B %d, %Y'),
             'lunch_url': f"{base_url}/web#action=19_lunch_management.action_lunch_record_my",
         }
         
@@ -183,7 +318,7 @@ class LunchEmailScheduler(models.Model):
         }
 
     def action_send_now(self):
-        """Manually trigger email sending"""
+        """Manually trigger email sending; employees already reminded today are skipped"""
         self.ensure_one()
         self.last_sent_date = False  # Reset to allow sending
         self._send_lunch_reminder_emails()
@@ -193,8 +328,28 @@ class LunchEmailScheduler(models.Model):
             'tag': 'display_notification',
             'params': {
                 'title': 'Emails Sent',
-                'message': 'Lunch reminder emails have been sent to all employees.',
+                'message': 'Lunch reminder emails have been sent to all employees not reminded yet today.',
                 'type': 'success',
                 'sticky': False,
             }
-        }
\ No newline at end of file
+        }
+
+
+class LunchReminderLog(models.Model):
+    _name = 'lunch.reminder.log'
+    _description = 'Lunch Reminder Send Ledger'
+    _order = 'run_date desc, id desc'
+
+    run_date = fields.Date(string='Run Date', required=True, index=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True, ondelete='cascade')
+    scheduler_id = fields.Many2one('lunch.email.scheduler', string='Scheduler', ondelete='cascade')
+
+    _unique_run_employee = models.Constraint(
+        'unique(run_date, employee_id)',
+        'This employee has already been reminded on this date!',
+    )
+
+    @api.model
+    def _vacuum_old_entries(self, days=30):
+        """The ledger only matters for the current day; keep a month of history"""
+        self.search([('run_date', '<', fields.Date.today() - timedelta(days=days))]).unlink()
\ No newline at end of file
@@ -1,6 +1,9 @@
 from odoo import models, fields, api, exceptions, _
-from datetime import datetime
+from odoo.tools import split_every
+from collections import defaultdict
+from psycopg2 import errors
 import base64
+import csv
 import io
 import logging
 
@@ -13,21 +16,51 @@ except ImportError:
     PANDAS_AVAILABLE = False
     _logger.warning("pandas not installed. Excel import will not work.")
 
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+    _logger.warning("openpyxl not installed. Streaming Excel import will not work.")
+
+REQUIRED_COLUMNS = ['Employee Name', 'Date', 'Lunch Type', 'State']
+
 
 class LunchExcelImport(models.TransientModel):
     _name = 'lunch.excel.import'
     _description = 'Import Lunch Records from Excel'
 
     excel_file = fields.Binary(string='Excel File', required=True,
-                                help='Upload Excel file with lunch records')
+                                help='Upload Excel or CSV file with lunch records')
     filename = fields.Char(string='Filename')
+    import_mode = fields.Selection([
+        ('standard', 'Standard'),
+        ('streaming', 'Streaming (large files)'),
+        ('background', 'Background')
+    ], string='Import Mode', default='standard', required=True,
+        help='Streaming reads the file row by row from the filestore and commits '
+             'every chunk, so memory stays flat whatever the file size. '
+             'Background does the same in a scheduled job and reports its progress')
+    chunk_size = fields.Integer(string='Chunk Size', default=2000,
+                                help='Rows processed and committed together in streaming and background modes')
     
     import_results = fields.Text(string='Import Results', readonly=True)
     state = fields.Selection([
         ('draft', 'Upload File'),
+        ('queued', 'Import Queued'),
         ('done', 'Import Complete')
     ], default='draft')
 
+    # Background import progress
+    job_id = fields.Many2one('lunch.import.job', string='Import Job', readonly=True)
+    job_state = fields.Selection(related='job_id.state', string='Job Status')
+    job_rows_done = fields.Integer(related='job_id.rows_done')
+    job_success_count = fields.Integer(related='job_id.success_count')
+    job_error_count = fields.Integer(related='job_id.error_count')
+    job_skipped_count = fields.Integer(related='job_id.skipped_count')
+    job_throughput = fields.Float(related='job_id.throughput')
+    job_error_log = fields.Text(related='job_id.error_log')
+
     def action_import_excel(self):
         """Import lunch records from Excel file"""
         self.ensure_one()
@@ -37,6 +70,11 @@ class LunchExcelImport(models.TransientModel):
                 _("pandas library is not installed. Please install it using: pip install pandas openpyxl")
             )
         
+        if self.import_mode == 'streaming':
+            return self._action_import_streaming()
+        if self.import_mode == 'background':
+            return self._action_import_background()
+        
         if not self.excel_file:
             raise exceptions.UserError(_("Please upload an Excel file first!"))
         
@@ -44,130 +82,424 @@ class LunchExcelImport(models.TransientModel):
             # Decode the file
             file_data = base64.b64decode(self.excel_file)
             
-            # Read Excel file
-            df = pd.read_excel(io.BytesIO(file_data))
+            # Read the file: CSV by extension, anything else (.xlsx, .xls) through pandas' Excel reader
+            if (self.filename or '').lower().endswith('.csv'):
+                df = pd.read_csv(io.BytesIO(file_data), encoding='utf-8-sig')
+            else:
+                df = pd.read_excel(io.BytesIO(file_data))
             
             # Validate columns
-            required_columns = ['Employee Name', 'Date', 'Lunch Type', 'State']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            self._check_import_columns(df.columns)
             
-            if missing_columns:
-                raise exceptions.UserError(
-                    _("Missing required columns: %s\n\nRequired columns are: %s") % 
-                    (', '.join(missing_columns), ', '.join(required_columns))
-                )
+            # Process records in bulk
+            stats = self._import_dataframe(df)
+            self.env['lunch.cost.summary']._trigger_refresh()
             
-            # Process records
-            success_count = 0
-            error_count = 0
-            error_messages = []
-            skipped_count = 0
+            self.write({
+                'import_results': self._format_import_results(stats),
+                'state': 'done'
+            })
             
-            for index, row in df.iterrows():
-                try:
-                    # Get employee
-                    employee_name = str(row['Employee Name']).strip()
-                    employee = self.env['hr.employee'].search([
-                        ('name', '=ilike', employee_name)
-                    ], limit=1)
-                    
-                    if not employee:
-                        error_messages.append(f"Row {index + 2}: Employee '{employee_name}' not found")
-                        error_count += 1
-                        continue
-                    
-                    # Parse date
-                    try:
-                        if isinstance(row['Date'], str):
-                            date_obj = datetime.strptime(row['Date'], '%Y-%m-%d').date()
-                        else:
-                            date_obj = pd.to_datetime(row['Date']).date()
-                    except Exception as e:
-                        error_messages.append(f"Row {index + 2}: Invalid date format - {row['Date']}")
-                        error_count += 1
-                        continue
-                    
-                    # Check if Saturday (holiday)
-                    if date_obj.weekday() == 5:
-                        skipped_count += 1
-                        continue
-                    
-                    # Get lunch type
-                    lunch_type_name = str(row['Lunch Type']).strip()
-                    lunch_type = self.env['lunch.types'].search([
-                        ('lunch_type', '=ilike', lunch_type_name)
-                    ], limit=1)
-                    
-                    if not lunch_type:
-                        error_messages.append(f"Row {index + 2}: Lunch type '{lunch_type_name}' not found")
-                        error_count += 1
-                        continue
-                    
-                    # Get state
-                    state = str(row['State']).strip().lower()
-                    if state not in ['draft', 'confirmed', 'cancelled']:
-                        state = 'confirmed'  # Default to confirmed for past records
-                    
-                    # Check if record already exists
-                    existing = self.env['lunch.record'].search([
-                        ('employee_id', '=', employee.id),
-                        ('date', '=', date_obj),
-                        ('state', '!=', 'cancelled')
-                    ], limit=1)
-                    
-                    if existing:
-                        # Update existing record
-                        existing.sudo().write({
-                            'lunch_type': lunch_type.id,
-                            'state': state,
-                            'note': row.get('Remarks', '') or ''
-                        })
-                        success_count += 1
-                    else:
-                        # Create new record
-                        self.env['lunch.record'].sudo().create({
-                            'employee_id': employee.id,
-                            'date': date_obj,
-                            'lunch_type': lunch_type.id,
-                            'state': state,
-                            'note': row.get('Remarks', '') or ''
-                        })
-                        success_count += 1
-                    
-                except Exception as e:
-                    error_messages.append(f"Row {index + 2}: {str(e)}")
-                    error_count += 1
+            return self._reopen_wizard()
             
-            # Prepare results message
-            results = f"""
-Import completed successfully!
+        except Exception as e:
+            raise exceptions.UserError(_("Error reading Excel file: %s") % str(e))
 
-✅ Successfully imported/updated: {success_count} records
-❌ Errors: {error_count}
-⏭️ Skipped (Saturdays): {skipped_count}
+    def _action_import_streaming(self):
+        """Import the uploaded file chunk by chunk, committing each chunk.
 
-"""
-            
-            if error_messages:
-                results += "\nError Details:\n" + "\n".join(error_messages[:20])
-                if len(error_messages) > 20:
-                    results += f"\n... and {len(error_messages) - 20} more errors"
+        When a chunk fails, the chunks committed before it are kept and the
+        results report their counts and the row to resume the import from.
+        """
+        attachment = self._get_excel_attachment()
+        if not attachment:
+            raise exceptions.UserError(_("Please upload an Excel file first!"))
+        
+        stats = self._new_import_stats()
+        rows_done = 0
+        resume_row = 2
+        chunks = self._iter_import_chunks(attachment, self.filename, self.chunk_size)
+        while True:
+            df = None
+            try:
+                df = next(chunks, None)
+                if df is None:
+                    break
+                chunk_stats = self._import_dataframe(df)
+            except Exception as e:
+                self.env.cr.rollback()
+                if not rows_done:
+                    raise exceptions.UserError(_("Error reading Excel file: %s") % str(e))
+                failed_row = int(df.index[0]) + 2 if df is not None else resume_row
+                _logger.exception("Lunch streaming import stopped at row %s", failed_row)
+                results = self._format_import_results(stats, title="Import stopped before the end of the file!")
+                results += (f"\n\n⚠️ Row {failed_row} and the following rows were not imported: {str(e)}"
+                            f"\n{rows_done} rows before it were saved; import the file again from row {failed_row}.")
+                self.write({'import_results': results, 'state': 'done'})
+                self.env['lunch.cost.summary']._trigger_refresh()
+                return self._reopen_wizard()
             
+            for key in ('success', 'error', 'skipped'):
+                stats[key] += chunk_stats[key]
+            stats['messages'] += chunk_stats['messages']
+            rows_done += len(df)
+            resume_row = int(df.index[-1]) + 3
+            self.env.cr.commit()
+        
+        self.env['lunch.cost.summary']._trigger_refresh()
+        self.write({
+            'import_results': self._format_import_results(stats),
+            'state': 'done'
+        })
+        return self._reopen_wizard()
+
+    def _action_import_background(self):
+        """Hand the uploaded file over to a queued import job"""
+        attachment = self._get_excel_attachment()
+        if not attachment:
+            raise exceptions.UserError(_("Please upload an Excel file first!"))
+        
+        job = self.env['lunch.import.job'].create({
+            'name': _("Import of %s") % (self.filename or attachment.name),
+            'filename': self.filename,
+            'chunk_size': self.chunk_size,
+        })
+        # Move the file to the job so it outlives this transient wizard
+        attachment.write({
+            'res_model': job._name,
+            'res_id': job.id,
+            'res_field': False,
+        })
+        job.attachment_id = attachment
+        job._enqueue()
+        
+        self.write({'job_id': job.id, 'state': 'queued'})
+        return self._reopen_wizard()
+
+    def action_refresh_progress(self):
+        """Poll the background job; show the summary once it is over"""
+        self.ensure_one()
+        job = self.job_id
+        if job.state in ('done', 'failed'):
+            stats = {
+                'success': job.success_count,
+                'error': job.error_count,
+                'skipped': job.skipped_count,
+                'messages': (job.error_log or '').splitlines(),
+            }
             self.write({
-                'import_results': results,
+                'import_results': self._format_import_results(stats),
                 'state': 'done'
             })
+        return self._reopen_wizard()
+
+    def _get_excel_attachment(self):
+        """Attachment holding the uploaded file, without loading its content"""
+        self.ensure_one()
+        return self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'excel_file')
+        ], limit=1)
+
+    @api.model
+    def _open_attachment(self, attachment):
+        """Binary stream on the attachment, read straight from the filestore"""
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw)
+
+    @api.model
+    def _iter_import_rows(self, attachment, filename):
+        """Yield the rows of a CSV file or of the first worksheet of an
+        Excel file one at a time, header row included"""
+        with self._open_attachment(attachment) as stream:
+            if (filename or attachment.name or '').lower().endswith('.csv'):
+                yield from csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+                return
             
-            return {
-                'type': 'ir.actions.act_window',
-                'res_model': 'lunch.excel.import',
-                'res_id': self.id,
-                'view_mode': 'form',
-                'target': 'new',
+            if not OPENPYXL_AVAILABLE:
+                raise exceptions.UserError(
+                    _("openpyxl library is not installed. Please install it using: pip install openpyxl")
+                )
+            workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+            try:
+                yield from workbook.worksheets[0].iter_rows(values_only=True)
+            finally:
+                workbook.close()
+
+    @api.model
+    def _iter_import_chunks(self, attachment, filename, chunk_size):
+        """Yield DataFrames of at most ``chunk_size`` rows.
+
+        The DataFrame index is the 0-based position of the row below the
+        header, so row numbers in error messages match the file. Blank rows
+        are skipped.
+        """
+        rows = self._iter_import_rows(attachment, filename)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(col) if col is not None else f'Unnamed: {idx}' for idx, col in enumerate(header)]
+        self._check_import_columns(header)
+        
+        width = len(header)
+        numbered_rows = (
+            (index, list(row[:width]) + [None] * (width - len(row)))
+            for index, row in enumerate(rows)
+            if any(value not in (None, '') for value in row)
+        )
+        for chunk in split_every(max(chunk_size, 1), numbered_rows, list):
+            yield pd.DataFrame(
+                [row for _index, row in chunk],
+                columns=header,
+                index=[index for index, _row in chunk],
+            )
+
+    @api.model
+    def _check_import_columns(self, columns):
+        """Raise if any of the required import columns is missing"""
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+        if missing_columns:
+            raise exceptions.UserError(
+                _("Missing required columns: %s\n\nRequired columns are: %s") % 
+                (', '.join(missing_columns), ', '.join(REQUIRED_COLUMNS))
+            )
+
+    @api.model
+    def _new_import_stats(self):
+        return {'success': 0, 'error': 0, 'skipped': 0, 'messages': []}
+
+    @api.model
+    def _format_import_results(self, stats, title="Import completed successfully!"):
+        """Prepare the summary shown in the wizard once the import is over"""
+        results = f"""
+{title}
+
+✅ Successfully imported/updated: {stats['success']} records
+❌ Errors: {stats['error']}
+⏭️ Skipped (Saturdays): {stats['skipped']}
+
+"""
+        error_messages = stats['messages']
+        if error_messages:
+            results += "\nError Details:\n" + "\n".join(error_messages[:20])
+            if len(error_messages) > 20:
+                results += f"\n... and {len(error_messages) - 20} more errors"
+        return results
+
+    @api.model
+    def _map_names_ilike(self, model_name, field_name, names):
+        """Resolve names case-insensitively in a single query.
+
+        Returns a dict mapping the lowercased name to the id of the first
+        matching record in the model's default order, i.e. the record a
+        ``search([(field_name, '=ilike', name)], limit=1)`` would return.
+        Names containing ``%``, ``_`` or ``\\`` are patterns for ``=ilike``:
+        they are rare, and resolved one by one with that very search.
+        """
+        names = sorted({name for name in names if name})
+        patterns = [name for name in names if any(char in name for char in '%_\\')]
+        names = [name for name in names if name not in patterns]
+        Model = self.env[model_name]
+        result = {}
+        if names:
+            domain = ['|'] * (len(names) - 1) + [(field_name, '=ilike', name) for name in names]
+            for record in Model.search_fetch(domain, [field_name]):
+                result.setdefault(record[field_name].lower(), record.id)
+        for pattern in patterns:
+            record = Model.search([(field_name, '=ilike', pattern)], limit=1)
+            if record:
+                result[pattern.lower()] = record.id
+        return result
+
+    @api.model
+    def _parse_import_dates(self, raw_dates):
+        """Vectorized date parsing: text must be YYYY-MM-DD, anything else
+        goes through pandas. Unparseable values become NaT."""
+        is_text = raw_dates.map(lambda value: isinstance(value, str))
+        dates = pd.Series(pd.NaT, index=raw_dates.index, dtype='datetime64[ns]')
+        if is_text.any():
+            dates[is_text] = pd.to_datetime(raw_dates[is_text], format='%Y-%m-%d', errors='coerce')
+        if (~is_text).any():
+            dates[~is_text] = pd.to_datetime(raw_dates[~is_text], errors='coerce')
+        return dates
+
+    @api.model
+    def _import_dataframe(self, df, stats=None):
+        """Import a DataFrame of lunch rows with a constant number of queries.
+
+        Employees, lunch types and existing records are resolved up front in
+        one query each, then all new rows go through a single batched
+        ``create`` and updates are grouped into one ``write`` per distinct set
+        of values. Row numbers in error messages follow the DataFrame index.
+        """
+        stats = stats if stats is not None else self._new_import_stats()
+        if df.empty:
+            return stats
+
+        employee_names = df['Employee Name'].astype(str).str.strip()
+        lunch_type_names = df['Lunch Type'].astype(str).str.strip()
+        states = df['State'].astype(str).str.strip().str.lower()
+        states = states.where(states.isin(['draft', 'confirmed', 'cancelled']), 'confirmed')
+        remarks = df['Remarks'] if 'Remarks' in df.columns else pd.Series('', index=df.index)
+        dates = self._parse_import_dates(df['Date'])
+        saturdays = dates.dt.weekday == 5
+
+        employees = self._map_names_ilike('hr.employee', 'name', employee_names.str.lower().unique())
+        lunch_types = self._map_names_ilike(
+            'lunch.types', 'lunch_type', lunch_type_names[~saturdays].str.lower().unique()
+        )
+
+        # Existing non-cancelled records for the file's date range, one query
+        valid_dates = dates.dropna()
+        live = {}
+        if employees and not valid_dates.empty:
+            existing = self.env['lunch.record'].search([
+                ('employee_id', 'in', list(set(employees.values()))),
+                ('date', '>=', valid_dates.min().date()),
+                ('date', '<=', valid_dates.max().date()),
+                ('state', '!=', 'cancelled')
+            ])
+            for record in existing:
+                live.setdefault((record.employee_id.id, record.date), ('write', record.id))
+
+        to_write = {}   # record id -> {'vals': ..., 'rows': [...]}
+        to_create = []  # [{'vals': ..., 'rows': [...]}]
+
+        for index, employee_name, date_value, raw_date, is_saturday, lunch_type_name, state, note in zip(
+                df.index, employee_names, dates, df['Date'], saturdays,
+                lunch_type_names, states, remarks):
+            row_no = index + 2
+
+            employee_id = employees.get(employee_name.lower())
+            if not employee_id:
+                stats['messages'].append(f"Row {row_no}: Employee '{employee_name}' not found")
+                stats['error'] += 1
+                continue
+
+            if pd.isna(date_value):
+                stats['messages'].append(f"Row {row_no}: Invalid date format - {raw_date}")
+                stats['error'] += 1
+                continue
+
+            # Check if Saturday (holiday)
+            if is_saturday:
+                stats['skipped'] += 1
+                continue
+
+            lunch_type_id = lunch_types.get(lunch_type_name.lower())
+            if not lunch_type_id:
+                stats['messages'].append(f"Row {row_no}: Lunch type '{lunch_type_name}' not found")
+                stats['error'] += 1
+                continue
+
+            note = note or ''
+            vals = {
+                'lunch_type': lunch_type_id,
+                'state': state,
+                'note': note if isinstance(note, str) else str(note),
             }
-            
-        except Exception as e:
-            raise exceptions.UserError(_("Error reading Excel file: %s") % str(e))
+
+            # Later rows for the same employee/day update the earlier one,
+            # exactly like the row-by-row lookup used to
+            key = (employee_id, date_value.date())
+            target = live.get(key)
+            if target is None:
+                entry = {'vals': dict(vals, employee_id=employee_id, date=key[1]), 'rows': [row_no]}
+                to_create.append(entry)
+                target = ('create', entry)
+            elif target[0] == 'write':
+                entry = to_write.setdefault(target[1], {'vals': {}, 'rows': []})
+                entry['vals'] = vals
+                entry['rows'].append(row_no)
+            else:
+                # The row-by-row import created on the first row and wrote the
+                # later ones: their lunch type is kept, unlike the create's
+                target[1]['vals'].update(vals)
+                target[1]['update'] = vals
+                target[1]['rows'].append(row_no)
+
+            if state == 'cancelled':
+                live.pop(key, None)
+            else:
+                live[key] = target
+
+        # Writes first: cancelling an existing record frees its day for a new one
+        self._flush_import_writes(to_write, stats)
+        self._flush_import_creates(to_create, stats)
+        return stats
+
+    @api.model
+    def _flush_import_writes(self, to_write, stats):
+        """Write pending updates, one ``write`` per distinct set of values"""
+        Record = self.env['lunch.record'].sudo()._with_quiet_mode()
+        groups = defaultdict(list)
+        for record_id, entry in to_write.items():
+            groups[tuple(sorted(entry['vals'].items()))].append(record_id)
+
+        for vals_key, record_ids in groups.items():
+            try:
+                with self.env.cr.savepoint():
+                    Record.browse(record_ids).write(dict(vals_key))
+                stats['success'] += sum(len(to_write[rid]['rows']) for rid in record_ids)
+            except Exception:
+                # Fall back to one write per record to report the failing rows
+                for record_id in record_ids:
+                    entry = to_write[record_id]
+                    try:
+                        with self.env.cr.savepoint():
+                            Record.browse(record_id).write(entry['vals'])
+                        stats['success'] += len(entry['rows'])
+                    except errors.UniqueViolation:
+                        record = Record.browse(record_id)
+                        self._add_row_errors(stats, entry['rows'],
+                                             Record._get_duplicate_message(record.employee_id, record.date))
+                    except Exception as e:
+                        self._add_row_errors(stats, entry['rows'], e)
+
+    @api.model
+    def _flush_import_creates(self, to_create, stats):
+        """Create all new records with a single batched ``create``"""
+        if not to_create:
+            return
+        Record = self.env['lunch.record'].sudo()._with_quiet_mode()
+        try:
+            with self.env.cr.savepoint():
+                records = Record.create([entry['vals'] for entry in to_create])
+                self._apply_import_updates(records, to_create)
+            stats['success'] += sum(len(entry['rows']) for entry in to_create)
+        except Exception:
+            # Fall back to one create per record to report the failing rows
+            for entry in to_create:
+                try:
+                    with self.env.cr.savepoint():
+                        record = Record.create(entry['vals'])
+                        self._apply_import_updates(record, [entry])
+                    stats['success'] += len(entry['rows'])
+                except errors.UniqueViolation:
+                    employee = self.env['hr.employee'].browse(entry['vals']['employee_id'])
+                    self._add_row_errors(stats, entry['rows'],
+                                         Record._get_duplicate_message(employee, entry['vals']['date']))
+                except Exception as e:
+                    self._add_row_errors(stats, entry['rows'], e)
+
+    @api.model
+    def _apply_import_updates(self, records, entries):
+        """``create`` picks the lunch type of the weekday: restore the one of
+        the file where later rows updated a created record"""
+        by_lunch_type = defaultdict(list)
+        for record, entry in zip(records, entries):
+            if 'update' in entry:
+                by_lunch_type[entry['update']['lunch_type']].append(record.id)
+        for lunch_type_id, record_ids in by_lunch_type.items():
+            records.browse(record_ids).write({'lunch_type': lunch_type_id})
+
+    @api.model
+    def _add_row_errors(self, stats, rows, error):
+        for row_no in rows:
+            stats['messages'].append(f"Row {row_no}: {str(error)}")
+            stats['error'] += 1
 
     def action_download_template(self):
         """Download Excel template for lunch records"""
@@ -221,7 +553,10 @@ Import completed successfully!
 
     def action_back(self):
         """Go back to upload form"""
-        self.write({'state': 'draft', 'import_results': False})
+        self.write({'state': 'draft', 'import_results': False, 'job_id': False})
+        return self._reopen_wizard()
+
+    def _reopen_wizard(self):
         return {
             'type': 'ir.actions.act_window',
             'res_model': 'lunch.excel.import',
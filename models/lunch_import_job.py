@@ -0,0 +1,136 @@
+from odoo import models, fields, api, exceptions, _
+from .lunch_record import SYSTEM_OPERATION_KEY
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+MAX_LOGGED_ERRORS = 200
+
+
+class LunchImportJob(models.Model):
+    _name = 'lunch.import.job'
+    _description = 'Background Lunch Import Job'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(string='Name', required=True, readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='File', readonly=True, ondelete='set null')
+    filename = fields.Char(string='Filename', readonly=True)
+    chunk_size = fields.Integer(string='Chunk Size', default=2000, readonly=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='queued', required=True, readonly=True)
+
+    # Progress, updated after every committed chunk
+    next_row = fields.Integer(string='Next Row', readonly=True,
+                              help='Index of the first data row not processed yet, used to resume')
+    rows_done = fields.Integer(string='Rows Processed', readonly=True)
+    success_count = fields.Integer(string='Imported/Updated', readonly=True)
+    error_count = fields.Integer(string='Errors', readonly=True)
+    skipped_count = fields.Integer(string='Skipped (Saturdays)', readonly=True)
+    error_log = fields.Text(string='Error Details', readonly=True)
+    date_start = fields.Datetime(string='Started On', readonly=True)
+    date_end = fields.Datetime(string='Finished On', readonly=True)
+    throughput = fields.Float(string='Throughput (rows/s)', compute='_compute_throughput', digits=(16, 1))
+
+    @api.depends('rows_done', 'date_start', 'date_end')
+    def _compute_throughput(self):
+        now = fields.Datetime.now()
+        for job in self:
+            elapsed = ((job.date_end or now) - job.date_start).total_seconds() if job.date_start else 0
+            job.throughput = job.rows_done / elapsed if elapsed > 0 else 0.0
+
+    def _enqueue(self):
+        """Wake the import cron up so queued jobs start right away"""
+        self.env.ref('19_lunch_management.cron_process_lunch_import_jobs')._trigger()
+
+    @api.model
+    def _cron_process_import_jobs(self):
+        """Scheduled action: process queued jobs and resume interrupted ones"""
+        for job in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            job._process()
+
+    def _process(self):
+        """Import the job's file chunk by chunk, committing after each chunk.
+
+        A chunk that fails is rolled back on its own and reported; chunks
+        committed before it are kept. ``next_row`` lets a job killed by the
+        cron time limit resume where it stopped on the next run.
+        """
+        self.ensure_one()
+        # Queued by an administrator: past dates and Saturdays are allowed
+        Import = self.env['lunch.excel.import'].with_context(**{SYSTEM_OPERATION_KEY: True})
+        if not self.date_start:
+            self.date_start = fields.Datetime.now()
+        self.state = 'running'
+        self.env.cr.commit()
+
+        try:
+            if not self.attachment_id:
+                raise exceptions.UserError(_("The file of this import job is no longer available."))
+            for df in Import._iter_import_chunks(self.attachment_id, self.filename, self.chunk_size):
+                df = df[df.index >= self.next_row]
+                if df.empty:
+                    continue
+                started = time.monotonic()
+                stats = Import._new_import_stats()
+                try:
+                    with self.env.cr.savepoint():
+                        Import._import_dataframe(df, stats)
+                except Exception as e:
+                    _logger.exception("Lunch import job %s: chunk starting at row %s failed", self.id, df.index[0] + 2)
+                    self.env.invalidate_all()
+                    # Saturdays would have been skipped whatever the failure
+                    stats = Import._new_import_stats()
+                    stats['skipped'] = int((Import._parse_import_dates(df['Date']).dt.weekday == 5).sum())
+                    stats['error'] = len(df) - stats['skipped']
+                    stats['messages'].append(f"Rows {df.index[0] + 2}-{df.index[-1] + 2}: {str(e)}")
+                self._record_chunk(df, stats)
+                self.env.cr.commit()
+                _logger.info(
+                    "Lunch import job %s: rows %s-%s done in %.2fs",
+                    self.id, df.index[0] + 2, df.index[-1] + 2, time.monotonic() - started
+                )
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception("Lunch import job %s failed", self.id)
+            self.write({
+                'state': 'failed',
+                'date_end': fields.Datetime.now(),
+                'error_log': self._append_errors([str(e)]),
+            })
+            self.env.cr.commit()
+            return
+
+        # The file is only kept for failed jobs, to investigate or resume them
+        attachment = self.attachment_id
+        self.write({'state': 'done', 'date_end': fields.Datetime.now()})
+        attachment.sudo().unlink()
+        self.env['lunch.cost.summary']._trigger_refresh()
+        self.env.cr.commit()
+
+    def _record_chunk(self, df, stats):
+        self.write({
+            'next_row': int(df.index[-1]) + 1,
+            'rows_done': self.rows_done + len(df),
+            'success_count': self.success_count + stats['success'],
+            'error_count': self.error_count + stats['error'],
+            'skipped_count': self.skipped_count + stats['skipped'],
+            'error_log': self._append_errors(stats['messages']),
+        })
+
+    def _append_errors(self, messages):
+        """Keep the error log bounded, like the wizard summary does"""
+        logged = (self.error_log or '').splitlines()
+        room = MAX_LOGGED_ERRORS - len(logged)
+        if not messages or room <= 0:
+            return self.error_log
+        return "\n".join(logged + messages[:room])
+
+    def action_requeue(self):
+        """Restart a failed job from the first unprocessed row"""
+        self.filtered(lambda job: job.state == 'failed').write({'state': 'queued', 'date_end': False})
+        self._enqueue()
@@ -0,0 +1,235 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from collections import defaultdict
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# States counted for the kitchen; cancelled records are not counted
+KITCHEN_STATES = ('draft', 'requested', 'confirmed')
+# Days back from today recounted by the nightly reconciliation
+RECONCILE_DAYS = 7
+
+
+class LunchKitchenCountDelta(models.Model):
+    _name = 'lunch.kitchen.count.delta'
+    _description = 'Pending Kitchen Headcount Change'
+    _log_access = False
+
+    # Insert-only journal written by LunchKitchenCount._add_deltas
+    date = fields.Date(string='Date', required=True)
+    lunch_type = fields.Many2one('lunch.types', string='Lunch Type', ondelete='cascade')
+    work_location_id = fields.Many2one('hr.work.location', string='Work Location', ondelete='set null')
+    draft_count = fields.Integer(string='Draft')
+    requested_count = fields.Integer(string='Requested')
+    confirmed_count = fields.Integer(string='Confirmed')
+    confirmed_cost = fields.Float(string='Confirmed Cost')
+
+
+class LunchKitchenCount(models.Model):
+    _name = 'lunch.kitchen.count'
+    _description = 'Kitchen Headcount per Day'
+    _order = 'date desc, lunch_type, work_location_id'
+    _rec_name = 'date'
+
+    date = fields.Date(string='Date', required=True, readonly=True)
+    lunch_type = fields.Many2one('lunch.types', string='Lunch Type', readonly=True, ondelete='cascade')
+    work_location_id = fields.Many2one('hr.work.location', string='Work Location', readonly=True,
+                                       ondelete='set null')
+    draft_count = fields.Integer(string='Draft', readonly=True)
+    requested_count = fields.Integer(string='Requested', readonly=True)
+    confirmed_count = fields.Integer(string='Confirmed', readonly=True)
+    confirmed_cost = fields.Float(string='Confirmed Cost', readonly=True)
+    expected_count = fields.Integer(string='Expected', compute='_compute_forecast',
+                                    help='Draft, requested and confirmed records')
+    forecast_cost = fields.Float(string='Forecast Cost', compute='_compute_forecast',
+                                 help='Cost if every expected lunch is confirmed')
+
+    # One counter row per day, lunch type and location, target of the upserts
+    _counter_key = models.UniqueIndex("(date, lunch_type, COALESCE(work_location_id, 0))")
+
+    @api.depends('draft_count', 'requested_count', 'confirmed_count', 'lunch_type.cost')
+    def _compute_forecast(self):
+        for count in self:
+            count.expected_count = count.draft_count + count.requested_count + count.confirmed_count
+            count.forecast_cost = count.expected_count * count.lunch_type.cost
+
+    def init(self):
+        # Fill the counters once, when the module is installed
+        self.env.cr.execute("SELECT 1 FROM lunch_kitchen_count LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._reconcile(date_from=False)
+
+    @api.model
+    def _add_deltas(self, deltas):
+        """Record counter changes of the current transaction.
+
+        ``deltas`` is a list of ``(key, state, count, cost)`` where ``key`` is
+        ``(date, lunch_type_id, work_location_id)``. The counter rows are hot
+        while everyone confirms, so the changes are only inserted into the
+        delta journal here: inserts never collide, and a rolled back
+        transaction or savepoint drops its deltas with it. Right after the
+        commit the journal is folded into the counters, see ``_fold_deltas``.
+        """
+        pending = defaultdict(lambda: [0, 0, 0, 0.0])
+        for key, state, count, cost in deltas:
+            if state not in KITCHEN_STATES or not key[0]:
+                continue
+            entry = pending[key]
+            entry[KITCHEN_STATES.index(state)] += count
+            if state == 'confirmed':
+                entry[3] += cost
+        rows = [
+            SQL("(%s, %s, %s, %s, %s, %s, %s)", date, lunch_type_id or None, location_id or None, *entry)
+            for (date, lunch_type_id, location_id), entry in pending.items()
+            if any(entry)
+        ]
+        if not rows:
+            return
+        self.env.cr.execute(SQL("""
+            INSERT INTO lunch_kitchen_count_delta (date, lunch_type, work_location_id, draft_count,
+                                                   requested_count, confirmed_count, confirmed_cost)
+                 VALUES %s
+        """, SQL(", ").join(rows)))
+        self._schedule_fold()
+
+    @api.model
+    def _add_cost_deltas(self, old_costs):
+        """Journal the confirmed cost change of every counter row after the
+        cost of lunch types changed; ``old_costs`` maps type ids to their
+        former cost. The stored record costs are recomputed first."""
+        if not old_costs:
+            return
+        self.env['lunch.record'].flush_model(['cost', 'state', 'date', 'lunch_type', 'employee_id'])
+        self.env['hr.employee'].flush_model(['work_location_id'])
+        self.env.cr.execute(SQL("""
+            INSERT INTO lunch_kitchen_count_delta (date, lunch_type, work_location_id, draft_count,
+                                                   requested_count, confirmed_count, confirmed_cost)
+                 SELECT r.date, r.lunch_type, e.work_location_id, 0, 0, 0, SUM(r.cost - old.cost)
+                   FROM lunch_record r
+                   JOIN hr_employee e ON e.id = r.employee_id
+                   JOIN (VALUES %s) AS old(lunch_type, cost) ON old.lunch_type = r.lunch_type
+                  WHERE r.state = 'confirmed'
+               GROUP BY r.date, r.lunch_type, e.work_location_id
+                 HAVING SUM(r.cost - old.cost) != 0
+        """, SQL(", ").join(SQL("(%s, %s::float8)", type_id, cost) for type_id, cost in old_costs.items())))
+        if self.env.cr.rowcount:
+            self._schedule_fold()
+
+    @api.model
+    def _schedule_fold(self):
+        """Fold the journal into the counters once the transaction commits"""
+        postcommit = self.env.cr.postcommit
+        if 'lunch.kitchen.count' in postcommit.data:
+            return
+        postcommit.data['lunch.kitchen.count'] = True
+        registry = self.env.registry
+
+        @postcommit.add
+        def fold_deltas():
+            try:
+                with registry.cursor() as cr:
+                    # Concurrent folds wait on the counter rows instead of
+                    # failing on them as they would under REPEATABLE READ
+                    cr.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+                    self.with_env(self.env(cr=cr))._fold_deltas()
+            except Exception:
+                _logger.warning("Kitchen counter changes not folded, the next commit or the nightly "
+                                "reconciliation will fold them", exc_info=True)
+
+    @api.model
+    def _fold_deltas(self):
+        """Move the committed journal rows into the counter rows in one
+        statement. Rows a concurrent fold has locked are left to that fold."""
+        self.env.cr.execute(SQL("""
+            WITH moved AS (
+                DELETE FROM lunch_kitchen_count_delta
+                 WHERE id IN (SELECT id FROM lunch_kitchen_count_delta FOR UPDATE SKIP LOCKED)
+             RETURNING date, lunch_type, work_location_id, draft_count, requested_count,
+                       confirmed_count, confirmed_cost
+            )
+            INSERT INTO lunch_kitchen_count AS kc (date, lunch_type, work_location_id, draft_count,
+                                                   requested_count, confirmed_count, confirmed_cost,
+                                                   create_uid, create_date, write_uid, write_date)
+                 SELECT date, lunch_type, work_location_id, SUM(draft_count), SUM(requested_count),
+                        SUM(confirmed_count), SUM(confirmed_cost), %(uid)s, %(now)s, %(uid)s, %(now)s
+                   FROM moved
+               GROUP BY date, lunch_type, work_location_id
+               ORDER BY date, lunch_type, work_location_id
+            ON CONFLICT (date, lunch_type, COALESCE(work_location_id, 0)) DO UPDATE
+                    SET draft_count = kc.draft_count + EXCLUDED.draft_count,
+                        requested_count = kc.requested_count + EXCLUDED.requested_count,
+                        confirmed_count = kc.confirmed_count + EXCLUDED.confirmed_count,
+                        confirmed_cost = kc.confirmed_cost + EXCLUDED.confirmed_cost,
+                        write_date = EXCLUDED.write_date
+        """, uid=self.env.uid, now=fields.Datetime.now()))
+
+    @api.model
+    def _reconcile(self, date_from=None):
+        """Recount the counters of the days from ``date_from`` (default: a
+        week ago, False: every day) from the lunch records"""
+        if date_from is None:
+            date_from = fields.Date.today() - timedelta(days=RECONCILE_DAYS)
+        self.env['lunch.record'].flush_model()
+        self.env['hr.employee'].flush_model(['work_location_id'])
+        # Committed journal rows of these days are part of the recount
+        for table in ('lunch_kitchen_count_delta', 'lunch_kitchen_count'):
+            self.env.cr.execute(SQL(
+                "DELETE FROM %s WHERE %s",
+                SQL.identifier(table),
+                SQL("date >= %s", date_from) if date_from else SQL("TRUE"),
+            ))
+        self.env.cr.execute(SQL("""
+            INSERT INTO lunch_kitchen_count (date, lunch_type, work_location_id, draft_count,
+                                             requested_count, confirmed_count, confirmed_cost,
+                                             create_uid, create_date, write_uid, write_date)
+                 SELECT r.date, r.lunch_type, e.work_location_id,
+                        COUNT(*) FILTER (WHERE r.state = 'draft'),
+                        COUNT(*) FILTER (WHERE r.state = 'requested'),
+                        COUNT(*) FILTER (WHERE r.state = 'confirmed'),
+                        COALESCE(SUM(r.cost) FILTER (WHERE r.state = 'confirmed'), 0.0),
+                        %(uid)s, %(now)s, %(uid)s, %(now)s
+                   FROM lunch_record r
+                   JOIN hr_employee e ON e.id = r.employee_id
+                  WHERE r.state IN %(states)s AND %(since)s
+               GROUP BY r.date, r.lunch_type, e.work_location_id
+        """, uid=self.env.uid, now=fields.Datetime.now(), states=KITCHEN_STATES,
+            since=SQL("r.date >= %s", date_from) if date_from else SQL("TRUE")))
+        self.invalidate_model()
+
+    @api.model
+    def _cron_reconcile(self):
+        """Scheduled action: repair counters drifted by lost deltas"""
+        self._reconcile()
+        _logger.info("Kitchen counters reconciled")
+
+    @api.model
+    def action_reconcile(self):
+        self.check_access('write')
+        self._reconcile()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'reload',
+        }
+
+    @api.model
+    def _get_headcount(self, date):
+        """Headcount and cost of a day, per lunch type and location"""
+        counts = self.search_fetch([('date', '=', date)], [
+            'lunch_type', 'work_location_id', 'draft_count', 'requested_count',
+            'confirmed_count', 'confirmed_cost',
+        ])
+        return {
+            'date': fields.Date.to_string(date),
+            'lines': [{
+                'lunch_type': count.lunch_type.lunch_type,
+                'work_location': count.work_location_id.name or False,
+                'draft': count.draft_count,
+                'requested': count.requested_count,
+                'confirmed': count.confirmed_count,
+                'expected': count.expected_count,
+                'confirmed_cost': count.confirmed_cost,
+                'forecast_cost': count.forecast_cost,
+            } for count in counts],
+        }
\ No newline at end of file
@@ -1,6 +1,48 @@
 from odoo import models, fields, api, exceptions, _
-from datetime import datetime, timedelta
-import pytz
+from odoo.fields import Command
+from odoo.tools import SQL
+from psycopg2 import errors
+from collections import namedtuple
+from datetime import timedelta
+from markupsafe import Markup
+import logging
+import re
+
+_logger = logging.getLogger(__name__)
+
+# Role of the current user towards lunch records, see LunchRecord._get_lunch_access
+LunchAccess = namedtuple('LunchAccess', ['is_system', 'is_lunch_admin', 'employee_id'])
+# Context key of the scheduled jobs allowed to bypass the employee, date and
+# Saturday rules; only honoured in superuser environments, see _as_system
+SYSTEM_OPERATION_KEY = 'lunch_system_operation'
+
+# Chatter of system and bulk operations (imports, crons, bulk actions), see
+# LunchRecord._with_quiet_mode:
+#   full     track, subscribe and log like an interactive action
+#   batched  no followers, creation notes or per-record tracking; state
+#            transitions are still tracked, in one batched insert
+#   quiet    no chatter at all
+CHATTER_POLICY_PARAM = 'lunch_management.bulk_chatter_policy'
+DEFAULT_CHATTER_POLICY = 'batched'
+# Fields that move a record between kitchen counters, see lunch.kitchen.count
+KITCHEN_FIELDS = {'state', 'date', 'lunch_type', 'employee_id'}
+
+QUIET_CONTEXT = {
+    'tracking_disable': True,
+    'mail_create_nosubscribe': True,
+    'mail_create_nolog': True,
+    'mail_notrack': True,
+}
+
+
+def _duplicate_record_message(env, diagnostics):
+    """Error of the one-record-per-day index, naming the employee and the
+    day from the key reported by PostgreSQL"""
+    match = re.search(r'=\((\d+), ([\d-]+)\)', getattr(diagnostics, 'message_detail', None) or '')
+    if not match:
+        return "Lunch record already exists for this employee on this date. Only one record per day is allowed."
+    employee = env['hr.employee'].sudo().browse(int(match[1]))
+    return env['lunch.record']._get_duplicate_message(employee, fields.Date.to_date(match[2]))
 
 
 class LunchRecord(models.Model):
@@ -38,6 +80,14 @@ class LunchRecord(models.Model):
         store=False
     )
     
+    # Denormalized owner: record rules and "my records" filter on this
+    # column alone instead of joining hr_employee
+    user_id = fields.Many2one(
+        'res.users', string='User',
+        related='employee_id.user_id',
+        store=True
+    )
+    
     date = fields.Date(
         string='Date',
         default=lambda self: self._default_lunch_date(),
@@ -75,54 +125,78 @@ class LunchRecord(models.Model):
         store=False
     )
 
-    _sql_constraints = [
-        ('unique_employee_date',
-         'unique(employee_id, date, state)',
-         'Lunch already recorded for this employee on this date!')
-    ]
+    # One non-cancelled record per employee and day, enforced by PostgreSQL
+    # so batch creates need no per-record duplicate search
+    _unique_employee_date_active = models.UniqueIndex(
+        "(employee_id, date) WHERE state != 'cancelled'",
+        _duplicate_record_message,
+    )
 
-    @api.constrains('employee_id', 'date')
-    def _check_unique_lunch_per_day(self):
-        for record in self:
-            if record.date and record.state != 'cancelled':
-                duplicate = self.env['lunch.record'].search([
-                    ('employee_id', '=', record.employee_id.id),
-                    ('date', '=', record.date),
-                    ('id', '!=', record.id),
-                    ('state', '!=', 'cancelled')
-                ], limit=1)
-                if duplicate:
-                    raise exceptions.ValidationError(
-                        f"Lunch record already exists for {record.employee_id.name} on {record.date.strftime('%B %d, %Y')} ({record.day}). "
-                        "Only one record per day is allowed."
-                    )
+    # Access patterns: date ranges by state (reports, admin lists), an
+    # employee's records by date, a user's own records (my records, record
+    # rule) and the requested queue
+    _date_state_idx = models.Index("(date, state)")
+    _employee_date_idx = models.Index("(employee_id, date)")
+    _user_date_idx = models.Index("(user_id, date)")
+    _requested_date_idx = models.Index("(date) WHERE state = 'requested'")
+
+    def init(self):
+        # Superseded by the partial index above: it also forbade two cancelled records on the same day
+        self.env.cr.execute("ALTER TABLE lunch_record DROP CONSTRAINT IF EXISTS lunch_record_unique_employee_date")
+
+    def _as_system(self):
+        """Superuser recordset bypassing the lunch rules, for scheduled jobs"""
+        return self.sudo().with_context(**{SYSTEM_OPERATION_KEY: True})
+
+    @api.model
+    def _get_duplicate_message(self, employee, date):
+        return (f"Lunch record already exists for {employee.name} on {date.strftime('%B %d, %Y')} "
+                f"({date.strftime('%A')}). Only one record per day is allowed.")
 
     def _default_employee(self):
-        return self.env['hr.employee'].search([
-            ('user_id', '=', self.env.user.id)
-        ], limit=1)
+        return self.env['hr.employee'].browse(self._get_lunch_access().employee_id)
+
+    def _get_lunch_access(self):
+        """Resolve the current user's role and linked employee once per request.
+
+        Group checks and the employee lookup are cached on the cursor, so
+        loops over large recordsets do not repeat them for every record. The
+        employee search depends on superuser mode and the active companies,
+        which are part of the cache key.
+        System administrators are lunch administrators as well, and so are
+        the scheduled jobs running through ``_as_system``; a plain ``sudo()``
+        keeps the rules of the current user.
+        """
+        system_operation = self.env.su and bool(self.env.context.get(SYSTEM_OPERATION_KEY))
+        key = ('lunch_access', self.env.uid, self.env.su, system_operation, tuple(self.env.companies.ids))
+        access = self.env.cr.cache.get(key)
+        if access is None:
+            user = self.env.user
+            is_system = system_operation or user.has_group('base.group_system')
+            employee = self.env['hr.employee'].search([('user_id', '=', user.id)], limit=1)
+            access = LunchAccess(
+                is_system=is_system,
+                is_lunch_admin=is_system or user.has_group('lunch_management.group_lunch_admin'),
+                employee_id=employee.id,
+            )
+            self.env.cr.cache[key] = access
+        return access
 
     def _compute_is_user_admin(self):
         """Check if current user is admin"""
+        is_system = self._get_lunch_access().is_system
         for record in self:
-            record.is_user_admin = self.env.user.has_group('base.group_system')
+            record.is_user_admin = is_system
     
     def _compute_is_employee_readonly(self):
         """Employee field is readonly for non-admin users"""
+        is_system = self._get_lunch_access().is_system
         for record in self:
-            record.is_employee_readonly = not self.env.user.has_group('base.group_system')
+            record.is_employee_readonly = not is_system
 
     def _default_lunch_date(self):
         """Return next working day (tomorrow, skip Saturday)"""
-        nepal_tz = pytz.timezone('Asia/Kathmandu')
-        today = datetime.now(nepal_tz).date()
-        tomorrow = today + timedelta(days=1)
-        
-        # If tomorrow is Saturday (5), skip to Sunday (6)
-        if tomorrow.weekday() == 5:
-            tomorrow = tomorrow + timedelta(days=1)
-        
-        return tomorrow
+        return self.env['lunch.timing']._next_working_day()
 
     @api.depends('date')
     def _compute_day(self):
@@ -134,13 +208,13 @@ class LunchRecord(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
+        access = self._get_lunch_access()
         for vals in vals_list:
             # Set employee automatically for non-admin
-            if not self.env.user.has_group('lunch_management.group_lunch_admin'):
-                employee = self.env['hr.employee'].search([('user_id', '=', self.env.user.id)], limit=1)
-                if not employee:
+            if not access.is_lunch_admin:
+                if not access.employee_id:
                     raise exceptions.ValidationError(_("No employee linked with your user account."))
-                vals['employee_id'] = employee.id
+                vals['employee_id'] = access.employee_id
 
             # === AUTO SELECT LUNCH TYPE BASED ON DAY ===
             date_str = vals.get('date') or self._default_lunch_date()
@@ -148,118 +222,245 @@ class LunchRecord(models.Model):
             weekday = date_obj.weekday()  # 0=Monday, 5=Saturday, 6=Sunday
 
             # Saturday = Holiday → Block creation (unless admin)
-            if weekday == 5 and not self.env.user.has_group('base.group_system'):
+            if weekday == 5 and not access.is_system:
                 raise exceptions.ValidationError(
                     _("Saturday is a holiday. No lunch record allowed.")
                 )
 
-            # Determine lunch type
-            lunch_type_name = "Non-Veg" if weekday in (0, 4) else "Veg"  # 0=Monday, 4=Friday
-
-            lunch_type = self.env['lunch.types'].search([('lunch_type', '=', lunch_type_name)], limit=1)
-            if not lunch_type:
+            # Determine lunch type from the weekday rules (cached)
+            lunch_type_id = self.env['lunch.types']._get_lunch_type_id_for_weekday(weekday)
+            if not lunch_type_id:
                 raise exceptions.ValidationError(
-                    _(f"Lunch type '{lunch_type_name}' not found. Please create it in Configuration.")
+                    _("No lunch type found for %s. Please create it in Configuration.") % date_obj.strftime('%A')
                 )
-            vals['lunch_type'] = lunch_type.id
+            vals['lunch_type'] = lunch_type_id
 
         # Create the records
         records = super(LunchRecord, self).create(vals_list)
+        self.env['lunch.kitchen.count']._add_deltas(records._kitchen_deltas(1))
 
         # Set state to draft
-        if not self.env.user.has_group('base.group_system'):
+        if not access.is_system:
             records.filtered(lambda r: r.state == 'draft').write({'state': 'draft'})
 
         return records
 
     def _check_employee_access(self):
-        for rec in self:
-            if self.env.user.has_group('base.group_system') or self.env.user.has_group('lunch_management.group_lunch_admin'):
-                continue
-            emp = self.env['hr.employee'].search([
-                ('user_id', '=', self.env.user.id)
-            ], limit=1)
-            if rec.employee_id != emp:
-                raise exceptions.AccessError(
-                    _("You cannot modify other employees' lunch records.")
-                )
+        access = self._get_lunch_access()
+        if access.is_lunch_admin:
+            return
+        if any(rec.employee_id.id != access.employee_id for rec in self):
+            raise exceptions.AccessError(
+                _("You cannot modify other employees' lunch records.")
+            )
 
     # BLOCK EDIT AFTER CONFIRM
     def write(self, vals):
+        is_system = self._get_lunch_access().is_system
+        
         # Block employee change for non-admin users
-        if 'employee_id' in vals and not self.env.user.has_group('base.group_system'):
+        if 'employee_id' in vals and not is_system:
             raise exceptions.UserError(
                 _("You cannot change the employee. Please contact admin if needed.")
             )
         
         # Block date change for non-admin users
-        if 'date' in vals and not self.env.user.has_group('base.group_system'):
+        if 'date' in vals and not is_system:
             raise exceptions.UserError(
                 _("You cannot change the lunch date. The date is automatically set to tomorrow. Please contact admin if you need to change it.")
             )
         
         if 'state' not in vals:
             confirmed_records = self.filtered(lambda r: r.state in ('confirmed', 'requested'))
-            if confirmed_records and not self.env.user.has_group('base.group_system'):
+            if confirmed_records and not is_system:
                 raise exceptions.UserError(
                     _("You cannot edit a confirmed or requested lunch record.")
                 )
         self._check_employee_access()
-        return super(LunchRecord, self).write(vals)
+        # Quiet bulk writes skip mail tracking: log their state changes in one batch
+        old_states = ({rec.id: rec.state for rec in self}
+                      if 'state' in vals and self.env.context.get('lunch_batched_tracking') else None)
+        removed = self._kitchen_deltas(-1) if KITCHEN_FIELDS.intersection(vals) else None
+        res = super(LunchRecord, self).write(vals)
+        if removed is not None:
+            self.env['lunch.kitchen.count']._add_deltas(removed + self._kitchen_deltas(1))
+        if old_states:
+            self.filtered(lambda rec: old_states[rec.id] != rec.state)._track_state_change(
+                old_states, vals['state'])
+        return res
+
+    def unlink(self):
+        # Archived records are history, the kitchen counters only matter for recent days
+        removed = [] if self.env.context.get('lunch_archiving') else self._kitchen_deltas(-1)
+        res = super(LunchRecord, self).unlink()
+        self.env['lunch.kitchen.count']._add_deltas(removed)
+        return res
+
+    def _kitchen_deltas(self, sign, states=None):
+        """Kitchen counter changes for adding (``sign`` 1) or removing (-1)
+        the records, in their current state or the one given in ``states``"""
+        return [(
+            (rec.date, rec.lunch_type.id, rec.employee_id.work_location_id.id),
+            states[rec.id] if states else rec.state,
+            sign,
+            sign * rec.cost,
+        ) for rec in self]
+
+    def _with_quiet_mode(self):
+        """The records in the context of a system or bulk operation, with
+        chatter reduced as configured by the bulk chatter policy"""
+        policy = self.env['ir.config_parameter'].sudo().get_param(CHATTER_POLICY_PARAM, DEFAULT_CHATTER_POLICY)
+        if policy == 'full':
+            return self
+        return self.with_context(QUIET_CONTEXT, lunch_batched_tracking=policy == 'batched')
+
+    def _for_selection(self):
+        """Interactive actions on one record keep the full audit trail,
+        actions on a selection follow the bulk chatter policy"""
+        return self._with_quiet_mode() if len(self) > 1 else self
+
+    def _chatter_enabled(self):
+        context = self.env.context
+        return not context.get('tracking_disable') or context.get('lunch_batched_tracking')
+
+    def _transition_state(self, state, from_states):
+        """Move the records still in one of ``from_states`` to ``state``.
+
+        The state is changed by one guarded ``UPDATE ... WHERE state IN``:
+        records that another transaction already moved, or is moving right
+        now (row locked), are left alone instead of waiting for the lock and
+        failing the whole request. Under the REPEATABLE READ isolation of the
+        cursor, locking a row another transaction committed after our
+        snapshot raises a serialization failure rather than skipping it: the
+        records are then retried one by one and those rows left alone too.
+        The state change is tracked in the chatter of the records that
+        actually transitioned, which are returned.
+        """
+        if not self:
+            return self
+        self.check_access('write')
+        self._check_employee_access()
+        self.flush_recordset(['state'])
+        now = fields.Datetime.now()
+
+        def update_state(ids):
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(SQL("""
+                    WITH old AS (
+                        SELECT id, state FROM lunch_record
+                         WHERE id = ANY(%(ids)s) AND state = ANY(%(from_states)s)
+                           FOR NO KEY UPDATE SKIP LOCKED
+                    )
+                    UPDATE lunch_record rec
+                       SET state = %(state)s, write_uid = %(uid)s, write_date = %(now)s
+                      FROM old
+                     WHERE rec.id = old.id
+                 RETURNING rec.id, old.state
+                """, ids=ids, from_states=list(from_states), state=state, uid=self.env.uid, now=now))
+                return self.env.cr.fetchall()
+
+        try:
+            old_states = dict(update_state(self.ids))
+        except errors.SerializationFailure:
+            old_states = {}
+            for rec_id in self.ids:
+                try:
+                    old_states.update(update_state([rec_id]))
+                except errors.SerializationFailure:
+                    continue
+        self.invalidate_recordset(['state', 'write_uid', 'write_date'])
+        changed = self.browse([rec_id for rec_id in self.ids if rec_id in old_states])
+        changed.modified(['state'])
+        self.env['lunch.kitchen.count']._add_deltas(
+            changed._kitchen_deltas(-1, old_states) + changed._kitchen_deltas(1))
+        if len(changed) < len(self):
+            _logger.info("lunch.record %s: %s of %s records moved to %s, the others changed concurrently",
+                         self.ids[:10], len(changed), len(self), state)
+        changed._track_state_change(old_states, state)
+        return changed
+
+    def _track_state_change(self, old_states, state):
+        """Log the tracking message of a state transition, in one batch"""
+        if not self or not self._chatter_enabled():
+            return
+        col_info = self.fields_get(['state'])['state']
+        note = self.env['ir.model.data']._xmlid_to_res_id('mail.mt_note')
+        Tracking = self.env['mail.tracking.value']
+        self.env['mail.message'].sudo().create([{
+            'model': self._name,
+            'res_id': rec.id,
+            'body': '',
+            'message_type': 'notification',
+            'subtype_id': note,
+            'author_id': self.env.user.partner_id.id,
+            'tracking_value_ids': [Command.create(
+                Tracking._create_tracking_values(old_states[rec.id], state, 'state', col_info, rec)
+            )],
+        } for rec in self])
 
     # Confirm Action with Validation Message
     def action_confirm(self):
-        self.ensure_one()
+        """Confirm the selected records.
+
+        Works on any selection: states and the confirmation window are
+        validated once for the whole recordset, the state is written in a
+        single statement and admin notes are logged in one batch.
+        """
+        if not self:
+            return False
+        is_system = self._get_lunch_access().is_system
         
         # Only admin can confirm requested records
-        if self.state == 'requested' and not self.env.user.has_group('base.group_system'):
+        if not is_system and any(rec.state == 'requested' for rec in self):
             raise exceptions.UserError(_("Only admin can confirm requested records. Please wait for admin approval."))
         
-        if self.state not in ('draft', 'requested'):
+        if any(rec.state not in ('draft', 'requested') for rec in self):
             raise exceptions.UserError(_("Only draft or requested records can be confirmed."))
 
-        nepal_tz = pytz.timezone('Asia/Kathmandu')
-        now = datetime.now(nepal_tz)
-        current_hour = now.hour + (now.minute / 60.0)
-
-        timing = self.env['lunch.timing'].search([], limit=1)
-        if not timing:
-            raise exceptions.UserError(_("Lunch timing is not configured. Please contact admin."))
-
         # Check if within allowed time window (skip check for admin or requested records)
-        if self.state != 'requested' and not self.env.user.has_group('base.group_system'):
-            if not (timing.start_time <= current_hour <= timing.end_time):
-                raise exceptions.UserError(
-                    _("You cannot confirm lunch now. Confirmation is only allowed between %s and %s. Current time: %s") %
-                    (self._format_time(timing.start_time), 
-                    self._format_time(timing.end_time),
-                    self._format_time(current_hour))
-                )
+        self._check_confirm_window(check_time=not is_system and any(rec.state != 'requested' for rec in self))
 
-        self.write({'state': 'confirmed'})
+        confirmed = self._for_selection()._transition_state('confirmed', ('draft', 'requested'))
         
-        # Add message if admin confirmed a requested record
-        if self.state == 'confirmed' and self.env.user.has_group('base.group_system'):
-            self.message_post(
-                body=_('Admin %s confirmed this lunch record.') % self.env.user.name,
-                message_type='notification',
-                subtype_xmlid='mail.mt_note'
-            )
+        # Add message if admin confirmed the records
+        if is_system and confirmed and confirmed._chatter_enabled():
+            body = _('Admin %s confirmed this lunch record.') % self.env.user.name
+            confirmed._message_log_batch(bodies={rec.id: body for rec in confirmed})
         
         # Return action to reload the form and show notification
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
-            'params': {
-                'title': 'Success!',
-                'message': 'Lunch record has been confirmed.',
-                'type': 'success',
-                'sticky': False,
-                'next': {
-                    'type': 'ir.actions.act_window_close',
-                }
-            }
+            'params': self._transition_notification(confirmed, 'Success!', 'confirmed', 'success'),
         }
+
+    def _check_confirm_window(self, check_time=True):
+        """Raise unless lunch timing is configured and, if ``check_time``,
+        the current time is inside the confirmation window"""
+        Timing = self.env['lunch.timing']
+        window = Timing._get_lunch_window()
+        if not window:
+            raise exceptions.UserError(_("Lunch timing is not configured. Please contact admin."))
+        if not check_time:
+            return
+
+        current_hour = Timing._current_hour(window)
+        if not (window.start_time <= current_hour <= window.end_time):
+            raise exceptions.UserError(
+                _("You cannot confirm lunch now. Confirmation is only allowed between %s and %s. Current time: %s") %
+                (self._format_time(window.start_time), 
+                self._format_time(window.end_time),
+                self._format_time(current_hour))
+            )
+
+    def action_approve_requested(self):
+        """Admin: confirm all requested records of the selection at once"""
+        if not self._get_lunch_access().is_system:
+            raise exceptions.AccessError(_("Only Admin can approve requested records."))
+        requested = self.filtered(lambda r: r.state == 'requested')
+        if not requested:
+            raise exceptions.UserError(_("None of the selected records is waiting for approval."))
+        return requested.action_confirm()
     
     def _format_time(self, float_time):
         hours = int(float_time)
@@ -268,64 +469,73 @@ class LunchRecord(models.Model):
 
     def action_cancel(self):
         """Allow cancellation only from draft state for employees"""
+        is_system = self._get_lunch_access().is_system
         for rec in self:
             if rec.state == 'cancelled':
                 raise exceptions.UserError(_("This record is already cancelled."))
             
             # Only admin can cancel confirmed/requested records
-            if rec.state in ('confirmed', 'requested') and not self.env.user.has_group('base.group_system'):
+            if rec.state in ('confirmed', 'requested') and not is_system:
                 raise exceptions.UserError(_("You cannot cancel a confirmed/requested lunch record. Please contact admin."))
             
             if rec.state not in ('draft', 'confirmed', 'requested'):
                 raise exceptions.UserError(_("Only draft, requested, or confirmed records can be cancelled."))
         
-        self.write({'state': 'cancelled'})
+        cancelled = self._for_selection()._transition_state(
+            'cancelled', ('draft', 'confirmed', 'requested') if is_system else ('draft',))
         
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
-            'params': {
-                'title': 'Cancelled',
-                'message': 'Lunch record has been cancelled.',
-                'type': 'warning',
-                'sticky': False,
-                'next': {
-                    'type': 'ir.actions.act_window_close',
-                }
-            }
+            'params': self._transition_notification(cancelled, 'Cancelled', 'cancelled', 'warning'),
         }
     
     def action_reset_draft(self):
-        if not self.env.user.has_group('base.group_system'):
+        if not self._get_lunch_access().is_system:
             raise exceptions.AccessError(_("Only Admin can reset to draft."))
-        self.write({'state': 'draft'})
+        reset = self._for_selection()._transition_state('draft', ('requested', 'confirmed', 'cancelled'))
         
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
-            'params': {
-                'title': 'Reset to Draft',
-                'message': 'Record has been reset to draft state.',
-                'type': 'info',
-                'sticky': False,
-                'next': {
-                    'type': 'ir.actions.act_window_close',
-                }
+            'params': self._transition_notification(reset, 'Reset to Draft', 'reset to draft', 'info'),
+        }
+
+    def _transition_notification(self, changed, title, label, notification_type):
+        """Notification parameters for a transition of the selection, based
+        on the ``changed`` records; a warning when none could be changed"""
+        if not changed:
+            title, notification_type = 'Nothing Changed', 'warning'
+            message = ('The lunch record was changed by someone else in the meantime, please reload it.'
+                       if len(self) == 1 else
+                       'The selected lunch records were changed by someone else in the meantime, please reload them.')
+        elif len(self) == 1:
+            message = f'Lunch record has been {label}.'
+        else:
+            message = f'{len(changed)} of {len(self)} lunch records have been {label}.'
+        return {
+            'title': title,
+            'message': message,
+            'type': notification_type,
+            'sticky': False,
+            'next': {
+                'type': 'ir.actions.act_window_close',
             }
         }
     
     def action_request_admin_fill(self):
         """Request admin to fill lunch record on behalf of employee - Change state to requested"""
-        self.ensure_one()
+        if not self:
+            return False
         
-        if self.state != 'draft':
+        if any(rec.state != 'draft' for rec in self):
             raise exceptions.UserError(_("Only draft records can be requested."))
         
         # Change state to requested
-        self.write({'state': 'requested'})
+        requested = self._for_selection()._transition_state('requested', ('draft',))
         
-        # Post message in chatter
-        message = _(
+        # Log the request in the chatter of every record, in one batch
+        message = Markup(_(
             '<p><strong>🔔 Admin Fill Request</strong></p>'
             '<p>Employee <strong>%s</strong> has requested admin assistance for:</p>'
             '<ul>'
@@ -334,20 +544,26 @@ class LunchRecord(models.Model):
             '<li>Lunch Type: <strong>%s</strong></li>'
             '</ul>'
             '<p>Please confirm this record or use "Admin Fill Record" to create it.</p>'
-        ) % (self.employee_id.name, self.date, self.day, self.lunch_type.lunch_type)
-        
-        self.message_post(
-            body=message,
-            message_type='notification',
-            subtype_xmlid='mail.mt_comment'
-        )
+        ))
+        if requested._chatter_enabled():
+            requested._message_log_batch(bodies={
+                rec.id: message % (rec.employee_id.name, rec.date, rec.day, rec.lunch_type.lunch_type)
+                for rec in requested
+            })
         
+        if not requested:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': self._transition_notification(requested, 'Request Sent', 'requested', 'success'),
+            }
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
                 'title': '✅ Request Sent',
-                'message': 'Your request has been submitted. Admin will process it soon.',
+                'message': ('Your request has been submitted. Admin will process it soon.' if len(self) == 1
+                            else f'{len(requested)} requests have been submitted. Admin will process them soon.'),
                 'type': 'success',
                 'sticky': False,
                 'next': {'type': 'ir.actions.act_window_close'}
@@ -360,19 +576,15 @@ class LunchRecord(models.Model):
         action = self.env.ref('19_lunch_management.action_lunch_record_all').read()[0]
         
         # Admin sees only confirmed records + today filter
-        if self.env.user.has_group('base.group_system'):
-            # Get current user's employee record for admin's own drafts
-            admin_employee = self.env['hr.employee'].search([
-                ('user_id', '=', self.env.uid)
-            ], limit=1)
-            
+        access = self._get_lunch_access()
+        if access.is_system:
             # Domain: Show confirmed records OR admin's own drafts
-            if admin_employee:
+            if access.employee_id:
                 domain = [
                     '|',
                     ('state', '=', 'confirmed'),
                     '&',
-                    ('employee_id', '=', admin_employee.id),
+                    ('employee_id', '=', access.employee_id),
                     ('state', '=', 'draft')
                 ]
             else:
@@ -384,6 +596,87 @@ class LunchRecord(models.Model):
         
         return action
     
+    @api.model
+    def _get_my_next_day_record(self):
+        """Return the current user's active record for the next working day,
+        read with a single query on the (employee_id, date) index"""
+        employee_id = self._get_lunch_access().employee_id
+        if not employee_id:
+            raise exceptions.UserError(_("No employee linked with your user account."))
+        return self.search_fetch([
+            ('employee_id', '=', employee_id),
+            ('date', '=', self._default_lunch_date()),
+            ('state', '!=', 'cancelled'),
+        ], ['date', 'state', 'lunch_type'], limit=1)
+
+    def _get_quick_confirm_values(self):
+        """Plain values describing a record, for the quick confirm endpoint"""
+        if not self:
+            return {'record_id': False, 'date': fields.Date.to_string(self._default_lunch_date()), 'state': False}
+        self.ensure_one()
+        return {
+            'record_id': self.id,
+            'date': fields.Date.to_string(self.date),
+            'state': self.state,
+            'lunch_type': self.lunch_type.lunch_type,
+        }
+
+    @api.model
+    def _quick_confirm_next_day(self):
+        """Confirm the current user's lunch for the next working day.
+
+        Lightweight path of ``action_confirm`` for the quick confirm page: the
+        record is created quietly if the draft was not pre-generated, and the
+        confirmation is tracked like an interactive one, outside the quiet
+        context of the creation.
+        """
+        record = self._get_my_next_day_record()
+        if record.state in ('confirmed', 'requested'):
+            return dict(record._get_quick_confirm_values(), changed=False)
+        access = self._get_lunch_access()
+        record._check_confirm_window(check_time=not access.is_system)
+        if not record:
+            record = self.with_context(QUIET_CONTEXT).create(
+                {'employee_id': access.employee_id, 'date': self._default_lunch_date()})
+        record = record.with_env(self.env)
+        changed = record._transition_state('confirmed', ('draft',))
+        return dict(record._get_quick_confirm_values(), changed=bool(changed))
+
+    @api.model
+    def _cron_generate_next_day_drafts(self):
+        """Scheduled action: pre-create the draft record of every active
+        employee for the next working day, so employees only have to confirm.
+
+        Employees who already have a record that day (whatever its state) are
+        skipped; the missing rows are created in one batch, with the chatter
+        of the bulk chatter policy.
+        """
+        self = self._as_system()
+        day = self._default_lunch_date()
+        for attempt in range(2):
+            existing = self.with_context(active_test=False)._read_group(
+                [('date', '=', day)], ['employee_id'])
+            employees = self.env['hr.employee'].search(
+                [('id', 'not in', [employee.id for employee, in existing])])
+            if not employees:
+                return self.browse()
+            try:
+                with self.env.cr.savepoint():
+                    records = self._with_quiet_mode().create([{
+                        'employee_id': employee.id,
+                        'date': day,
+                        'state': 'draft',
+                    } for employee in employees])
+            except errors.UniqueViolation:
+                # An employee created their own record meanwhile: recompute the gap once
+                if attempt:
+                    raise
+                _logger.info("Lunch draft generation for %s raced with manual entries, retrying", day)
+                self.env.invalidate_all()
+                continue
+            _logger.info("Pre-generated %s draft lunch records for %s", len(records), day)
+            return records
+
     @api.depends('employee_id', 'date')
     def _compute_name(self):
         for rec in self:
@@ -409,7 +702,7 @@ class LunchRecord(models.Model):
         weekday = self.date.weekday()
 
         # Saturday = Holiday → block + warning (unless admin)
-        if weekday == 5 and not self.env.user.has_group('base.group_system'):
+        if weekday == 5 and not self._get_lunch_access().is_system:
             self.lunch_type = False
             return {
                 'warning': {
@@ -418,47 +711,54 @@ class LunchRecord(models.Model):
                 }
             }
 
-        # Monday & Friday → Non-Veg, rest → Veg
-        target_name = "Non-Veg" if weekday in (0, 4) else "Veg"
-
-        lunch_type = self.env['lunch.types'].search([('lunch_type', '=', target_name)], limit=1)
-        if lunch_type:
-            self.lunch_type = lunch_type.id
-        else:
-            self.lunch_type = False
+        # Default lunch type of the weekday (Monday & Friday → Non-Veg, rest → Veg unless configured)
+        self.lunch_type = self.env['lunch.types']._get_lunch_type_for_weekday(weekday)
 
 
 class LunchAdminFillWizard(models.TransientModel):
     _name = 'lunch.admin.fill.wizard'
     _description = 'Admin Fill Lunch Record Wizard'
 
-    employee_id = fields.Many2one('hr.employee', string='Employee', required=True)
+    fill_mode = fields.Selection([
+        ('single', 'Single Record'),
+        ('bulk', 'Many Employees and Dates')
+    ], string='Fill', default='single', required=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee')
     date = fields.Date(string='Date', required=True, default=fields.Date.context_today)
-    lunch_type = fields.Many2one('lunch.types', string='Lunch Type', required=True)
+    lunch_type = fields.Many2one('lunch.types', string='Lunch Type')
     note = fields.Text(string='Remarks')
 
+    # Bulk fill
+    employee_ids = fields.Many2many('hr.employee', string='Employees')
+    department_id = fields.Many2one('hr.department', string='Department',
+                                    help='Fill for every employee of this department (sub-departments included)')
+    date_to = fields.Date(string='To Date', help='Last day of the range; Saturdays are skipped')
+
     @api.onchange('date')
     def _onchange_date_lunch_type(self):
         """Auto-select lunch type based on weekday"""
         if self.date:
-            weekday = self.date.weekday()
-            target_name = "Non-Veg" if weekday in (0, 4) else "Veg"
-            lunch_type = self.env['lunch.types'].search([('lunch_type', '=', target_name)], limit=1)
+            lunch_type = self.env['lunch.types']._get_lunch_type_for_weekday(self.date.weekday())
             if lunch_type:
-                self.lunch_type = lunch_type.id
+                self.lunch_type = lunch_type
 
     def action_create_record(self):
         """Create lunch record on behalf of employee"""
         self.ensure_one()
         
+        if self.fill_mode == 'bulk':
+            return self._action_create_records_bulk()
+        
+        if not self.employee_id or not self.lunch_type:
+            raise exceptions.UserError(_("Please select an employee and a lunch type."))
+        
         # Check if record already exists
-        existing = self.env['lunch.record'].search([
+        day_records = self.env['lunch.record'].search([
             ('employee_id', '=', self.employee_id.id),
-            ('date', '=', self.date),
-            ('state', '!=', 'cancelled')
-        ], limit=1)
+            ('date', '=', self.date)
+        ])
         
-        if existing:
+        if day_records.filtered(lambda r: r.state != 'cancelled'):
             raise exceptions.ValidationError(
                 _('Lunch record already exists for %s on %s') % (self.employee_id.name, self.date)
             )
@@ -474,11 +774,7 @@ class LunchAdminFillWizard(models.TransientModel):
         })
         
         # Close any pending activities for this request
-        activities = self.env['mail.activity'].search([
-            ('res_model', '=', 'lunch.record'),
-            ('summary', 'ilike', self.employee_id.name)
-        ])
-        activities.action_done()
+        self._close_activities(day_records | record)
         
         return {
             'type': 'ir.actions.client',
@@ -490,4 +786,68 @@ class LunchAdminFillWizard(models.TransientModel):
                 'sticky': False,
                 'next': {'type': 'ir.actions.act_window_close'}
             }
-        }
\ No newline at end of file
+        }
+
+    def _action_create_records_bulk(self):
+        """Create the missing confirmed records for every selected employee
+        and working day of the range, with one pre-fetch and one create"""
+        employees = self.employee_ids
+        if self.department_id:
+            employees |= self.env['hr.employee'].search([('department_id', 'child_of', self.department_id.id)])
+        if not employees:
+            raise exceptions.UserError(_("Please select employees or a department."))
+        
+        date_to = self.date_to or self.date
+        if date_to < self.date:
+            raise exceptions.UserError(_("The end date must be after the start date."))
+        
+        # Working days only: Saturday is a holiday
+        dates = [
+            day for day in (self.date + timedelta(days=offset) for offset in range((date_to - self.date).days + 1))
+            if day.weekday() != 5
+        ]
+        
+        Record = self.env['lunch.record']._with_quiet_mode()
+        range_records = Record.search([
+            ('employee_id', 'in', employees.ids),
+            ('date', '>=', self.date),
+            ('date', '<=', date_to)
+        ])
+        taken = {(rec.employee_id.id, rec.date) for rec in range_records if rec.state != 'cancelled'}
+        
+        LunchTypes = self.env['lunch.types']
+        records = Record.create([{
+            'employee_id': employee.id,
+            'date': day,
+            'lunch_type': LunchTypes._get_lunch_type_id_for_weekday(day.weekday()),
+            'note': self.note or 'Created by admin',
+            'is_admin_request': True,
+            'state': 'confirmed'  # Auto-confirm admin-created records
+        } for employee in employees for day in dates if (employee.id, day) not in taken])
+        
+        self._close_activities(range_records | records)
+        
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Success',
+                'message': _('%(created)s lunch records created, %(skipped)s already existing skipped.') % {
+                    'created': len(records),
+                    'skipped': len(employees) * len(dates) - len(records),
+                },
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'}
+            }
+        }
+
+    def _close_activities(self, records):
+        """Mark the activities attached to these lunch records as done"""
+        if not records:
+            return
+        activities = self.env['mail.activity'].search([
+            ('res_model', '=', 'lunch.record'),
+            ('res_id', 'in', records.ids)
+        ])
+        activities.action_done()
\ No newline at end of file
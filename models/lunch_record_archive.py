@@ -0,0 +1,122 @@
+from odoo import models, fields, api
+from odoo.tools import html2plaintext
+from collections import defaultdict
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+ARCHIVE_HORIZON_PARAM = 'lunch_management.archive_horizon_days'
+DEFAULT_ARCHIVE_HORIZON_DAYS = 730
+ARCHIVE_BATCH_SIZE = 5000
+
+
+class LunchRecordArchive(models.Model):
+    _name = 'lunch.record.archive'
+    _description = 'Archived Lunch Record'
+    _order = 'date desc, id desc'
+
+    original_id = fields.Integer(string='Original Record ID', readonly=True)
+    name = fields.Char(string='Reference', readonly=True)
+    # Same integrity as lunch.record: employees with a lunch history cannot be deleted
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True, ondelete='restrict')
+    # Follows the employee's current user, like lunch.record.user_id
+    user_id = fields.Many2one('res.users', string='User', related='employee_id.user_id', store=True)
+    date = fields.Date(string='Date', readonly=True, required=True)
+    day = fields.Char(string='Day', readonly=True)
+    lunch_type = fields.Many2one('lunch.types', string='Lunch Type', readonly=True, ondelete='set null')
+    cost = fields.Float(string='Cost', readonly=True)
+    state = fields.Selection([
+        ('confirmed', 'Confirmed'),
+        ('cancelled', 'Cancelled'),
+    ], string='Status', readonly=True)
+    note = fields.Text(string='Remarks', readonly=True)
+    is_admin_request = fields.Boolean(string='Admin Request', readonly=True)
+    chatter_log = fields.Text(string='History', readonly=True,
+                              help='Messages and status changes of the record, compacted when it was archived')
+    archive_date = fields.Datetime(string='Archived On', readonly=True)
+
+    # Same access patterns as lunch.record: reports by date, own records
+    _date_state_idx = models.Index("(date, state)")
+    _employee_date_idx = models.Index("(employee_id, date)")
+    _user_date_idx = models.Index("(user_id, date)")
+
+    @api.model
+    def _get_archive_cutoff(self):
+        """Records dated before this day are archived, False when disabled"""
+        horizon = int(self.env['ir.config_parameter'].sudo().get_param(
+            ARCHIVE_HORIZON_PARAM, DEFAULT_ARCHIVE_HORIZON_DAYS))
+        return horizon > 0 and fields.Date.today() - timedelta(days=horizon)
+
+    @api.model
+    def _get_report_sources(self, domain):
+        """Models a report on ``domain`` has to read: the live records, plus
+        the archive when part of the requested range has been archived"""
+        sources = [self.env['lunch.record']]
+        if self.search_count(domain, limit=1):
+            sources.append(self)
+        return sources
+
+    @api.model
+    def _cron_archive_records(self):
+        """Scheduled action: move confirmed and cancelled records older than
+        the horizon out of lunch.record, one committed batch at a time"""
+        cutoff = self._get_archive_cutoff()
+        if not cutoff:
+            return
+        Record = self.env['lunch.record'].sudo()
+        archived = 0
+        while True:
+            records = Record.search([
+                ('date', '<', cutoff),
+                ('state', 'in', ('confirmed', 'cancelled')),
+            ], order='id', limit=ARCHIVE_BATCH_SIZE)
+            if not records:
+                break
+            self.sudo()._archive_records(records)
+            archived += len(records)
+            self.env.cr.commit()
+        if archived:
+            _logger.info("Archived %s lunch records dated before %s", archived, cutoff)
+            self.env['lunch.cost.summary']._trigger_refresh()
+
+    def _archive_records(self, records):
+        """Copy ``records`` to the archive with their compacted chatter, then
+        delete them with their messages, followers and activities"""
+        chatter = self._compact_chatter(records)
+        now = fields.Datetime.now()
+        self.create([{
+            'original_id': record.id,
+            'name': record.name,
+            'employee_id': record.employee_id.id,
+            'date': record.date,
+            'day': record.day,
+            'lunch_type': record.lunch_type.id,
+            'cost': record.cost,
+            'state': record.state,
+            'note': record.note,
+            'is_admin_request': record.is_admin_request,
+            'chatter_log': chatter.get(record.id),
+            'archive_date': now,
+        } for record in records])
+        records.with_context(lunch_archiving=True).unlink()
+
+    def _compact_chatter(self, records):
+        """One plain-text line per message of each record: date, author,
+        text and status changes"""
+        messages = self.env['mail.message'].search_fetch([
+            ('model', '=', 'lunch.record'),
+            ('res_id', 'in', records.ids),
+        ], ['res_id', 'date', 'author_id', 'body', 'tracking_value_ids'], order='id')
+        lines = defaultdict(list)
+        for message in messages:
+            parts = [html2plaintext(message.body).strip()] if message.body else []
+            parts += [
+                f"{tracking.old_value_char or ''} → {tracking.new_value_char or ''}"
+                for tracking in message.tracking_value_ids
+            ]
+            text = '; '.join(part for part in parts if part)
+            if text:
+                lines[message.res_id].append(
+                    f"{fields.Datetime.to_string(message.date)} {message.author_id.name or ''}: {text}")
+        return {res_id: '\n'.join(entries) for res_id, entries in lines.items()}
\ No newline at end of file
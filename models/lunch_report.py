@@ -1,7 +1,30 @@
 from odoo import models, fields, api
+from odoo.tools import SQL, split_every
+from odoo.tools.pdf import merge_pdf
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from odoo.exceptions import UserError
+import csv
+import io
+import logging
+import tempfile
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+    _logger.warning("openpyxl not installed. XLSX export will not work.")
+
+LUNCH_REPORT = '19_lunch_management.action_report_lunch'
+EXPORT_BATCH_SIZE = 2000
+EXPORT_HEADER = ['Employee', 'Date', 'Day', 'Lunch Type', 'Status', 'Cost']
+# Columns read for the export, common to lunch.record and lunch.record.archive
+EXPORT_COLUMNS = ['id', 'employee_id', 'date', 'day', 'lunch_type', 'state', 'cost']
 
 
 class LunchReportWizard(models.TransientModel):
@@ -20,13 +43,31 @@ class LunchReportWizard(models.TransientModel):
 
     employee_id = fields.Many2one('hr.employee', string='Employee')
 
+    # PDF generation
+    pdf_mode = fields.Selection([
+        ('single', 'Single Document'),
+        ('chunked', 'Per Employee Batches')
+    ], string='PDF Generation', default='single', required=True,
+        help='Per Employee Batches renders the report for a few employees at a time '
+             'and merges the PDFs, for company-wide reports over long periods')
+    employees_per_chunk = fields.Integer(string='Employees per Batch', default=50)
+    pdf_workers = fields.Integer(string='Parallel Workers', default=1,
+                                 help='Number of batches rendered at the same time')
+    export_format = fields.Selection([
+        ('xlsx', 'Excel (.xlsx)'),
+        ('csv', 'CSV (.csv)')
+    ], string='Export Format', default='xlsx', required=True)
+    store_pdf = fields.Boolean(string='Save as Attachment',
+                               help='Store the PDF as an attachment and download it, '
+                                    'batched PDFs are always stored')
+
     @api.onchange('date_from')
     def _onchange_date_from(self):
         if self.date_from:
             dt = datetime.strptime(str(self.date_from), '%Y-%m-%d')
             self.date_to = (dt + relativedelta(months=1, days=-1)).date()
 
-    def action_view_report(self):
+    def _get_report_domain(self):
         """Admin sees ONLY CONFIRMED | Employees see their own (draft + confirmed)"""
         self.ensure_one()
 
@@ -37,23 +78,37 @@ class LunchReportWizard(models.TransientModel):
             domain += [('state', '=', 'confirmed')]
         # Normal employee → only their own records (draft + confirmed)
         else:
-            domain += [('employee_id.user_id', '=', self.env.uid)]
+            domain += [('user_id', '=', self.env.uid)]
 
         if self.report_type == 'specific':
             if not self.employee_id:
                 raise UserError("Please select an employee.")
             domain += [('employee_id', '=', self.employee_id.id)]
 
-        # Use beautiful report list view if exists
-        try:
-            list_view = self.env.ref('19_lunch_management.view_lunch_record_report_list').id
-        except:
-            list_view = False
+        return domain
+
+    def action_view_report(self):
+        """Admin sees ONLY CONFIRMED | Employees see their own (draft + confirmed)"""
+        self.ensure_one()
+
+        domain = self._get_report_domain()
+
+        # Part of the period archived: list the live and archived records together
+        if len(self.env['lunch.record.archive']._get_report_sources(domain)) > 1:
+            res_model = 'lunch.report.line'
+            list_view = self.env.ref('19_lunch_management.view_lunch_report_line_list').id
+        else:
+            res_model = 'lunch.record'
+            # Use beautiful report list view if exists
+            try:
+                list_view = self.env.ref('19_lunch_management.view_lunch_record_report_list').id
+            except:
+                list_view = False
 
         action = {
             'name': 'Lunch Report',
             'type': 'ir.actions.act_window',
-            'res_model': 'lunch.record',
+            'res_model': res_model,
             'view_mode': 'list,form',
             'views': [(list_view, 'list'), (False, 'form')],
             'domain': domain,
@@ -74,33 +129,261 @@ class LunchReportWizard(models.TransientModel):
         """PDF: Same logic as View Report → Admin sees only confirmed"""
         self.ensure_one()
 
-        domain = [('date', '>=', self.date_from), ('date', '<=', self.date_to)]
+        domain = self._get_report_domain()
+        if not any(Model.search_count(domain, limit=1)
+                   for Model in self.env['lunch.record.archive']._get_report_sources(domain)):
+            raise UserError("No records found for the selected period.")
 
-        # Admin → ONLY CONFIRMED
-        if self.env.user.has_group('base.group_system'):
-            domain += [('state', '=', 'confirmed')]
-        # Normal employee → only their own
+        # The report aggregates the domain itself, see LunchReportDocument
+        report_data = {
+            'date_from': self.date_from,
+            'date_to': self.date_to,
+            'employee_id': self.employee_id.id if self.report_type == 'specific' else False,
+            'is_admin': self.env.user.has_group('base.group_system'),
+            'domain': domain,
+        }
+
+        if self.pdf_mode == 'chunked':
+            return self._download_pdf(self._render_report_chunked(report_data))
+        if self.store_pdf:
+            pdf, _report_type = self.env['ir.actions.report']._render_qweb_pdf(LUNCH_REPORT, data=report_data)
+            return self._download_pdf(pdf)
+        return self.env.ref(LUNCH_REPORT).report_action(None, data=report_data)
+
+    def _render_report_chunked(self, report_data):
+        """Render the report per batch of employees and merge the PDFs.
+
+        Employees keep the report order (by name); the header is printed in
+        the first batch and the grand total of the whole period in the last.
+        With several workers, batches are rendered concurrently, each in its
+        own cursor.
+        """
+        domain = report_data['domain']
+        sources = self.env['lunch.record.archive']._get_report_sources(domain)
+        employees = self.env['hr.employee'].browse({
+            employee.id for Model in sources for [employee] in Model._read_group(domain, ['employee_id'])
+        }).sorted('name')
+        grand_total = sum(Model._read_group(domain, [], ['cost:sum'])[0][0] or 0.0 for Model in sources)
+
+        chunks = list(split_every(max(self.employees_per_chunk, 1), employees.ids, list))
+        chunk_data = [
+            dict(
+                report_data,
+                domain=domain + [('employee_id', 'in', employee_ids)],
+                show_header=index == 0,
+                show_grand_total=index == len(chunks) - 1,
+                grand_total=grand_total,
+            )
+            for index, employee_ids in enumerate(chunks)
+        ]
+
+        workers = max(min(self.pdf_workers, len(chunks)), 1)
+        _logger.info("Rendering lunch report in %s batches with %s workers", len(chunks), workers)
+        if workers == 1:
+            pdfs = [self._render_report_pdf(data) for data in chunk_data]
         else:
-            domain += [('employee_id.user_id', '=', self.env.uid)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pdfs = list(executor.map(self._render_report_pdf_in_new_cursor, chunk_data))
+        return merge_pdf(pdfs)
 
-        selected_emp_id = False
+    def _render_report_pdf(self, data):
+        pdf, _report_type = self.env['ir.actions.report']._render_qweb_pdf(LUNCH_REPORT, data=data)
+        return pdf
+
+    def _render_report_pdf_in_new_cursor(self, data):
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            return self.with_env(env)._render_report_pdf(data)
+
+    def _download_pdf(self, pdf):
+        """Store a generated report and return the action downloading it"""
+        attachment = self.env['ir.attachment'].create({
+            'name': f'Lunch_Report_{self.date_from}_{self.date_to}.pdf',
+            'type': 'binary',
+            'raw': pdf,
+            'mimetype': 'application/pdf',
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
+        }
+
+    def action_export_report(self):
+        """Export the View Report records to XLSX or CSV, with subtotals.
+
+        Rows are read through a server-side cursor in fixed-size batches and
+        written straight to a temporary file (openpyxl write-only mode for
+        XLSX), so memory does not grow with the date range.
+        """
+        self.ensure_one()
+
+        if self.export_format == 'xlsx' and not OPENPYXL_AVAILABLE:
+            raise UserError("openpyxl library is not installed. Please install it using: pip install openpyxl")
+
+        domain = self._get_report_domain()
+        with tempfile.TemporaryFile() as output:
+            if self.export_format == 'xlsx':
+                workbook = openpyxl.Workbook(write_only=True)
+                sheet = workbook.create_sheet('Lunch Report')
+                self._write_export_rows(sheet.append, domain)
+                workbook.save(output)
+            else:
+                text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+                writer = csv.writer(text)
+                self._write_export_rows(writer.writerow, domain)
+                text.flush()
+                text.detach()
+            output.seek(0)
+            content = output.read()
+
+        extension = self.export_format
+        attachment = self.env['ir.attachment'].create({
+            'name': f'Lunch_Report_{self.date_from}_{self.date_to}.{extension}',
+            'type': 'binary',
+            'raw': content,
+            'mimetype': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                         if extension == 'xlsx' else 'text/csv'),
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
+        }
+
+    def _write_export_rows(self, write_row, domain):
+        """Write the header, the records grouped per employee with a subtotal
+        of their confirmed cost, and the grand total"""
+        states = dict(self.env['lunch.record']._fields['state']._description_selection(self.env))
+        is_csv = self.export_format == 'csv'
+        write_row(EXPORT_HEADER)
+
+        current_employee, employee_name, subtotal, grand_total = None, None, 0.0, 0.0
+        for rows in self._fetch_export_rows(domain):
+            for name, employee_id, date, day, lunch_type, state, cost in rows:
+                if employee_id != current_employee:
+                    if current_employee is not None:
+                        write_row(['', '', '', '', f'Subtotal {employee_name}', subtotal])
+                    current_employee, employee_name, subtotal = employee_id, name, 0.0
+                if state == 'confirmed':
+                    subtotal += cost or 0.0
+                    grand_total += cost or 0.0
+                write_row([name, str(date) if is_csv else date, day, lunch_type, states.get(state, state), cost])
+
+        if current_employee is not None:
+            write_row(['', '', '', '', f'Subtotal {employee_name}', subtotal])
+        write_row(['', '', '', '', 'Grand Total', grand_total])
+
+    def _fetch_export_rows(self, domain):
+        """Yield batches of export rows ordered by employee name and date,
+        read through a server-side cursor (record rules applied), from the
+        live records and, when the range needs it, the archived ones"""
+        self.env['hr.employee'].flush_model(['name'])
+        self.env['lunch.types'].flush_model(['lunch_type'])
+
+        selects = []
+        for Model in self.env['lunch.record.archive']._get_report_sources(domain):
+            Model.flush_model()
+            query = Model._search(domain)
+            selects.append(SQL(
+                "SELECT %s FROM %s WHERE %s",
+                SQL(", ").join(SQL.identifier(Model._table, column) for column in EXPORT_COLUMNS),
+                query.from_clause, query.where_clause,
+            ))
+
+        cursor_name = SQL.identifier(f'lunch_report_export_{self.id}')
+        self.env.cr.execute(SQL("""
+            DECLARE %s NO SCROLL CURSOR FOR
+             SELECT e.name, rec.employee_id, rec.date, rec.day, t.lunch_type, rec.state, rec.cost
+               FROM (%s) AS rec
+               JOIN hr_employee e ON e.id = rec.employee_id
+          LEFT JOIN lunch_types t ON t.id = rec.lunch_type
+           ORDER BY e.name, rec.employee_id, rec.date, rec.id
+        """, cursor_name, SQL(" UNION ALL ").join(selects)))
+        try:
+            while True:
+                self.env.cr.execute(SQL("FETCH FORWARD %s FROM %s", EXPORT_BATCH_SIZE, cursor_name))
+                rows = self.env.cr.fetchall()
+                if not rows:
+                    break
+                yield rows
+        finally:
+            self.env.cr.execute(SQL("CLOSE %s", cursor_name))
+
+    def action_view_summary(self):
+        """Cost analysis of the period, read from the monthly summary"""
+        self.ensure_one()
+
+        domain = [
+            ('month', '>=', self.date_from.replace(day=1)),
+            ('month', '<=', self.date_to),
+        ]
         if self.report_type == 'specific':
             if not self.employee_id:
                 raise UserError("Please select an employee.")
             domain += [('employee_id', '=', self.employee_id.id)]
-            selected_emp_id = self.employee_id.id
 
-        records = self.env['lunch.record'].search(domain)
-        if not records:
-            raise UserError("No records found for the selected period.")
+        action = self.env.ref('19_lunch_management.action_lunch_cost_summary').read()[0]
+        action['domain'] = domain
+        return action
 
-        report_data = {
-            'date_from': self.date_from,
-            'date_to': self.date_to,
-            'employee_id': selected_emp_id,
-            'is_admin': self.env.user.has_group('base.group_system'),
+
+class LunchReportDocument(models.AbstractModel):
+    _name = 'report.19_lunch_management.report_lunch_document'
+    _description = 'Lunch Report PDF'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        data = data or {}
+        # From the wizard: its domain; from the Print menu: the selected records
+        domain = data.get('domain') or [('id', 'in', docids or [])]
+        return {
+            'doc_ids': docids,
+            'doc_model': 'lunch.record',
+            'data': data,
+            'payload': self._get_report_payload(domain),
         }
 
-        return self.env.ref('19_lunch_management.action_report_lunch').with_context(
-            report_data=report_data
-        ).report_action(records)
\ No newline at end of file
+    @api.model
+    def _get_report_payload(self, domain):
+        """Rows and totals of the report, grouped per employee.
+
+        Totals come from one grouped query and rows from one fetch per
+        source (live records, and archived ones when the range needs them),
+        so the template only iterates over precomputed values. Each employee
+        entry holds the total cost of its records, the subtotal of the
+        confirmed ones and the rows in the report order (most recent first).
+        """
+        sources = self.env['lunch.record.archive']._get_report_sources(domain)
+
+        totals = {}
+        rows = defaultdict(list)
+        for Model in sources:
+            for employee, state, cost, count in Model._read_group(
+                    domain, ['employee_id', 'state'], ['cost:sum', '__count']):
+                entry = totals.setdefault(employee, {'total': 0.0, 'subtotal': 0.0, 'count': 0})
+                entry['total'] += cost
+                entry['count'] += count
+                if state == 'confirmed':
+                    entry['subtotal'] += cost
+
+            for record in Model.search_fetch(domain, ['employee_id', 'date', 'day', 'lunch_type', 'cost', 'state']):
+                rows[record.employee_id].append({
+                    'date': record.date,
+                    'day': record.day,
+                    'lunch_type': record.lunch_type.lunch_type,
+                    'cost': record.cost,
+                    'confirmed': record.state == 'confirmed',
+                })
+        if len(sources) > 1:
+            for employee_rows in rows.values():
+                employee_rows.sort(key=lambda row: row['date'], reverse=True)
+
+        employees = [
+            dict(totals[employee], name=employee.name, rows=rows[employee])
+            for employee in sorted(totals, key=lambda emp: emp.name or '')
+        ]
+        return {
+            'employees': employees,
+            'grand_total': sum(employee['total'] for employee in employees),
+        }
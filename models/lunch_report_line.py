@@ -0,0 +1,49 @@
+from odoo import models, fields, tools
+
+
+class LunchReportLine(models.Model):
+    _name = 'lunch.report.line'
+    _description = 'Lunch Report Line'
+    _auto = False
+    _order = 'date desc, id desc'
+    _rec_name = 'name'
+
+    name = fields.Char(string='Reference', readonly=True)
+    record_id = fields.Many2one('lunch.record', string='Lunch Record', readonly=True)
+    archive_id = fields.Many2one('lunch.record.archive', string='Archived Record', readonly=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True)
+    date = fields.Date(string='Date', readonly=True)
+    day = fields.Char(string='Day', readonly=True)
+    lunch_type = fields.Many2one('lunch.types', string='Lunch Type', readonly=True)
+    cost = fields.Float(string='Cost', readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('requested', 'Requested'),
+        ('confirmed', 'Confirmed'),
+        ('cancelled', 'Cancelled'),
+    ], string='Status', readonly=True)
+    is_admin_request = fields.Boolean(string='Admin Created', readonly=True)
+    is_archived = fields.Boolean(string='Archived', readonly=True)
+
+    def init(self):
+        """Plain view over the live and the archived lunch records, for the
+        View Report list when part of the period has been archived.
+
+        Live rows get even ids and archived rows odd ones; filters on date,
+        state, employee or user reach the indexes of both tables.
+        """
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW lunch_report_line AS (
+                SELECT r.id * 2 AS id, r.name, r.id AS record_id, NULL::integer AS archive_id,
+                       r.employee_id, r.user_id, r.date, r.day, r.lunch_type, r.cost, r.state,
+                       r.is_admin_request, FALSE AS is_archived
+                  FROM lunch_record r
+                 UNION ALL
+                SELECT a.id * 2 + 1, a.name, NULL, a.id,
+                       a.employee_id, a.user_id, a.date, a.day, a.lunch_type, a.cost, a.state,
+                       a.is_admin_request, TRUE
+                  FROM lunch_record_archive a
+            )
+        """)
\ No newline at end of file
@@ -1,4 +1,14 @@
-from odoo import models, fields
+from odoo import models, fields, api, tools
+from collections import namedtuple
+from datetime import datetime, timedelta
+import pytz
+
+# Timezone of the lunch window when none is configured
+DEFAULT_LUNCH_TZ = 'Asia/Kathmandu'
+
+# Confirmation window of a company, see LunchTiming._get_lunch_window
+LunchWindow = namedtuple('LunchWindow', ['start_time', 'end_time', 'tz'])
+
 
 class LunchTiming(models.Model):
     _name = 'lunch.timing'
@@ -8,3 +18,63 @@ class LunchTiming(models.Model):
     start_time = fields.Float(string="Start Time (Hours)", required=True)
     end_time = fields.Float(string="End Time (Hours)", required=True)
     note = fields.Text(string="Remarks")
+    company_id = fields.Many2one('res.company', string='Company',
+                                 help='Leave empty to use this timing for every company without its own')
+    tz = fields.Selection('_tz_get', string='Timezone', required=True, default=DEFAULT_LUNCH_TZ,
+                          help='Timezone of the start and end times and of the next working day')
+
+    @api.model
+    def _tz_get(self):
+        return [(tz, tz) for tz in pytz.common_timezones]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env.registry.clear_cache()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env.registry.clear_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env.registry.clear_cache()
+        return super().unlink()
+
+    @api.model
+    def _get_lunch_window(self):
+        """Confirmation window of the current company, None if not configured"""
+        values = self._get_lunch_window_values(self.env.company.id)
+        return values and LunchWindow(*values)
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_lunch_window_values(self, company_id):
+        # The company's own timing first, then the shared one
+        timing = self.sudo().search([('company_id', 'in', (company_id, False))], order='company_id, id', limit=1)
+        if not timing:
+            return None
+        return (timing.start_time, timing.end_time, timing.tz or DEFAULT_LUNCH_TZ)
+
+    @api.model
+    def _now(self, window=None):
+        """Current time in the timezone of the lunch window"""
+        window = window or self._get_lunch_window()
+        return datetime.now(pytz.timezone(window.tz if window else DEFAULT_LUNCH_TZ))
+
+    @api.model
+    def _current_hour(self, window=None):
+        now = self._now(window)
+        return now.hour + (now.minute / 60.0)
+
+    @api.model
+    def _is_window_open(self, window=None):
+        window = window or self._get_lunch_window()
+        return bool(window) and window.start_time <= self._current_hour(window) <= window.end_time
+
+    @api.model
+    def _next_working_day(self):
+        """Tomorrow in the lunch timezone, Saturday (holiday) skipped to Sunday"""
+        tomorrow = self._now().date() + timedelta(days=1)
+        if tomorrow.weekday() == 5:
+            tomorrow += timedelta(days=1)
+        return tomorrow
\ No newline at end of file
@@ -1,4 +1,19 @@
-from odoo import models, fields
+from odoo import models, fields, api, tools
+
+WEEKDAYS = [
+    ('0', 'Monday'),
+    ('1', 'Tuesday'),
+    ('2', 'Wednesday'),
+    ('3', 'Thursday'),
+    ('4', 'Friday'),
+    ('5', 'Saturday'),
+    ('6', 'Sunday'),
+]
+
+# Fallback while no weekday rule is configured: Non-Veg on Monday & Friday, Veg otherwise
+DEFAULT_WEEKDAY_LUNCH_TYPES = {0: 'Non-Veg', 4: 'Non-Veg'}
+DEFAULT_LUNCH_TYPE = 'Veg'
+
 
 class LunchTypes(models.Model):
     _name = 'lunch.types'
@@ -7,4 +22,65 @@ class LunchTypes(models.Model):
     
     lunch_type = fields.Char(string='Lunch Type', required=True)
     cost = fields.Float(string='Cost', required=True)
-    note = fields.Text(string='Remarks')
\ No newline at end of file
+    note = fields.Text(string='Remarks')
+    weekday_rule_ids = fields.One2many('lunch.weekday.rule', 'lunch_type_id', string='Default On')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env.registry.clear_cache()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env.registry.clear_cache()
+        # Kitchen counters hold the confirmed cost: carry the change over to them
+        old_costs = {lunch_type.id: lunch_type.cost for lunch_type in self} if 'cost' in vals else None
+        res = super().write(vals)
+        if old_costs:
+            self.env['lunch.kitchen.count']._add_cost_deltas(old_costs)
+        return res
+
+    def unlink(self):
+        self.env.registry.clear_cache()
+        return super().unlink()
+
+    @api.model
+    def _get_lunch_type_for_weekday(self, weekday):
+        """Default lunch type for a weekday (0 = Monday), empty if none"""
+        return self.browse(self._get_lunch_type_id_for_weekday(weekday))
+
+    @api.model
+    @tools.ormcache('weekday')
+    def _get_lunch_type_id_for_weekday(self, weekday):
+        rule = self.env['lunch.weekday.rule'].sudo().search([('weekday', '=', str(weekday))], limit=1)
+        if rule:
+            return rule.lunch_type_id.id
+        name = DEFAULT_WEEKDAY_LUNCH_TYPES.get(weekday, DEFAULT_LUNCH_TYPE)
+        return self.sudo().search([('lunch_type', '=', name)], limit=1).id
+
+
+class LunchWeekdayRule(models.Model):
+    _name = 'lunch.weekday.rule'
+    _description = 'Default Lunch Type per Weekday'
+    _order = 'weekday'
+    _rec_name = 'weekday'
+
+    weekday = fields.Selection(WEEKDAYS, string='Weekday', required=True)
+    lunch_type_id = fields.Many2one('lunch.types', string='Lunch Type', required=True, ondelete='cascade')
+
+    _unique_weekday = models.Constraint(
+        'unique(weekday)',
+        'Only one default lunch type per weekday is allowed!',
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env.registry.clear_cache()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env.registry.clear_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        self.env.registry.clear_cache()
+        return super().unlink()
\ No newline at end of file
@@ -0,0 +1,3 @@
+from . import test_lunch_record_index_benchmark
+from . import test_lunch_confirm_load
+from . import test_lunch_excel_import
\ No newline at end of file
@@ -0,0 +1,177 @@
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2 import errors
+
+from odoo import api, sql_db
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+# Errors PostgreSQL raises when concurrent transactions collide
+CONCURRENCY_ERRORS = (errors.SerializationFailure, errors.DeadlockDetected, errors.LockNotAvailable)
+
+
+@tagged('-standard', '-at_install', 'post_install', 'lunch_load')
+class TestLunchConfirmLoad(TransactionCase):
+    """Burst of employees creating, editing and confirming tomorrow's lunch
+    at the same time, as at the opening of the confirmation window.
+
+    Every call runs in its own thread on its own database cursor and
+    commits, like concurrent HTTP workers would; the test server shares a
+    single cursor between requests, which would hide lock contention. The
+    generated users, employees and records are committed for the duration
+    of the run and removed afterwards.
+
+    Not part of the standard test run, use:
+        LUNCH_LOAD_USERS=2000 LUNCH_LOAD_THREADS=64 \\
+        odoo-bin -d <db> -i 19_lunch_management --test-tags lunch_load
+    """
+
+    N_USERS = int(os.environ.get('LUNCH_LOAD_USERS', 200))
+    N_THREADS = int(os.environ.get('LUNCH_LOAD_THREADS', 16))
+    LOCK_POLL_INTERVAL = 0.01
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dbname = cls.env.cr.dbname
+        cls.prefix = f'lunch_load_{int(time.time())}'
+        with cls._cursor() as cr:
+            env = api.Environment(cr, api.SUPERUSER_ID, {'no_reset_password': True, 'tracking_disable': True})
+            Record = env['lunch.record']
+            day = Record._default_lunch_date()
+
+            cls.created_type_ids = []
+            if not env['lunch.types']._get_lunch_type_id_for_weekday(day.weekday()):
+                cls.created_type_ids = env['lunch.types'].create([
+                    {'lunch_type': 'Veg', 'cost': 100.0},
+                    {'lunch_type': 'Non-Veg', 'cost': 150.0},
+                ]).ids
+
+            # Keep the confirmation window open for the whole run
+            timing = env['lunch.timing'].search([], limit=1)
+            cls.timing_backup = timing and timing.read(['start_time', 'end_time'])[0]
+            if timing:
+                timing.write({'start_time': 0.0, 'end_time': 23.99})
+            else:
+                timing = env['lunch.timing'].create({'start_time': 0.0, 'end_time': 23.99})
+            cls.timing_id = timing.id
+
+            users = env['res.users'].create([{
+                'name': f'Load Employee {i}',
+                'login': f'{cls.prefix}_{i}',
+            } for i in range(cls.N_USERS)])
+            employees = env['hr.employee'].create([{
+                'name': user.name,
+                'user_id': user.id,
+            } for user in users])
+            cls.user_ids = users.ids
+            cls.employee_ids = employees.ids
+            cls.day = day
+        _logger.info("Lunch load test: %s users generated for %s", cls.N_USERS, cls.day)
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls._cursor() as cr:
+            env = api.Environment(cr, api.SUPERUSER_ID, {'active_test': False})
+            env['lunch.record'].search([('employee_id', 'in', cls.employee_ids)]).unlink()
+            env['hr.employee'].browse(cls.employee_ids).unlink()
+            users = env['res.users'].browse(cls.user_ids)
+            partners = users.partner_id
+            users.unlink()
+            partners.unlink()
+            env['lunch.types'].browse(cls.created_type_ids).unlink()
+            if cls.timing_backup:
+                env['lunch.timing'].browse(cls.timing_id).write({
+                    'start_time': cls.timing_backup['start_time'],
+                    'end_time': cls.timing_backup['end_time'],
+                })
+            else:
+                env['lunch.timing'].browse(cls.timing_id).unlink()
+        super().tearDownClass()
+
+    @classmethod
+    def _cursor(cls):
+        """A real cursor, outside of the test transaction"""
+        return sql_db.db_connect(cls.dbname).cursor()
+
+    def _run_burst(self, label, call):
+        """Run ``call(env)`` once per generated user, concurrently, and report"""
+        latencies, failures, errors_seen = [], [], []
+        lock_samples = []
+        done = threading.Event()
+
+        def monitor():
+            with self._cursor() as cr:
+                while not done.is_set():
+                    cr.execute("""
+                        SELECT count(*) FROM pg_stat_activity
+                         WHERE datname = current_database() AND wait_event_type = 'Lock'
+                    """)
+                    lock_samples.append(cr.fetchone()[0])
+                    cr.rollback()
+                    time.sleep(self.LOCK_POLL_INTERVAL)
+
+        def task(uid):
+            started = time.perf_counter()
+            try:
+                with self._cursor() as cr:
+                    call(api.Environment(cr, uid, {}))
+                    cr.commit()
+            except CONCURRENCY_ERRORS as e:
+                failures.append(type(e).__name__)
+            except Exception as e:
+                errors_seen.append(str(e))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        watcher = threading.Thread(target=monitor, daemon=True)
+        watcher.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.N_THREADS) as pool:
+            list(pool.map(task, self.user_ids))
+        elapsed = time.perf_counter() - started
+        done.set()
+        watcher.join()
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        _logger.info(
+            "Lunch load test %s: %s calls, %s threads, %.1f calls/s\n"
+            "  latency ms: p50 %.1f, p95 %.1f, p99 %.1f, max %.1f\n"
+            "  serialization failures: %s, other errors: %s\n"
+            "  lock waits: %s samples, at most %s sessions waiting",
+            label, len(latencies), self.N_THREADS, len(latencies) / elapsed,
+            quantiles[49], quantiles[94], quantiles[98], max(latencies),
+            len(failures), len(errors_seen),
+            sum(1 for count in lock_samples if count), max(lock_samples, default=0),
+        )
+        self.assertFalse(errors_seen, f"{label}: {errors_seen[:5]}")
+        return failures
+
+    def test_confirmation_window_burst(self):
+        def create(env):
+            env['lunch.record'].create({})
+
+        def write(env):
+            env['lunch.record']._get_my_next_day_record().write({'note': 'Load test'})
+
+        def confirm(env):
+            env['lunch.record']._get_my_next_day_record().action_confirm()
+
+        self._run_burst('create', create)
+        self._run_burst('write', write)
+        self._run_burst('action_confirm', confirm)
+
+        with self._cursor() as cr:
+            cr.execute("""
+                SELECT state, count(*) FROM lunch_record
+                 WHERE employee_id = ANY(%s) AND date = %s
+              GROUP BY state
+            """, [self.employee_ids, self.day])
+            states = dict(cr.fetchall())
+        _logger.info("Lunch load test: final states %s", states)
+        self.assertEqual(sum(states.values()), self.N_USERS, "Every employee should have exactly one record")
\ No newline at end of file
@@ -0,0 +1,171 @@
+from datetime import date, datetime
+from unittest import skipUnless
+
+from odoo.tests import TransactionCase, tagged
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+MONDAY = date(2025, 1, 6)
+TUESDAY = date(2025, 1, 7)
+SATURDAY = date(2025, 1, 11)
+
+
+@skipUnless(PANDAS_AVAILABLE, "pandas is not installed")
+@tagged('-at_install', 'post_install')
+class TestLunchExcelImport(TransactionCase):
+    """The batched import must leave the same records and report the same
+    counts and errors as the former row-by-row import, replayed here by
+    ``_import_row_by_row``."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(user=cls.env.ref('base.user_admin'))
+        LunchTypes = cls.env['lunch.types']
+        cls.veg = LunchTypes.search([('lunch_type', '=', 'Veg')], limit=1) \
+            or LunchTypes.create({'lunch_type': 'Veg', 'cost': 100.0})
+        cls.non_veg = LunchTypes.search([('lunch_type', '=', 'Non-Veg')], limit=1) \
+            or LunchTypes.create({'lunch_type': 'Non-Veg', 'cost': 150.0})
+        cls.employees = cls.env['hr.employee'].create([
+            {'name': 'Import John Doe'},
+            {'name': 'Import Jane Smith'},
+            {'name': 'Import 100% Ann'},
+        ])
+        cls.john, cls.jane, cls.ann = cls.employees
+        # Records present before the import
+        cls.env['lunch.record'].sudo().create([
+            {'employee_id': cls.john.id, 'date': MONDAY, 'state': 'confirmed'},
+            {'employee_id': cls.jane.id, 'date': MONDAY, 'state': 'draft'},
+        ])
+
+    def _import_row_by_row(self, df):
+        """Former import: one lookup and one write or create per row"""
+        stats = self.env['lunch.excel.import']._new_import_stats()
+        for index, row in df.iterrows():
+            try:
+                employee_name = str(row['Employee Name']).strip()
+                employee = self.env['hr.employee'].search([('name', '=ilike', employee_name)], limit=1)
+                if not employee:
+                    stats['messages'].append(f"Row {index + 2}: Employee '{employee_name}' not found")
+                    stats['error'] += 1
+                    continue
+                try:
+                    if isinstance(row['Date'], str):
+                        date_obj = datetime.strptime(row['Date'], '%Y-%m-%d').date()
+                    else:
+                        date_obj = pd.to_datetime(row['Date']).date()
+                except Exception:
+                    stats['messages'].append(f"Row {index + 2}: Invalid date format - {row['Date']}")
+                    stats['error'] += 1
+                    continue
+                if date_obj.weekday() == 5:
+                    stats['skipped'] += 1
+                    continue
+                lunch_type_name = str(row['Lunch Type']).strip()
+                lunch_type = self.env['lunch.types'].search(
+                    [('lunch_type', '=ilike', lunch_type_name)], limit=1)
+                if not lunch_type:
+                    stats['messages'].append(f"Row {index + 2}: Lunch type '{lunch_type_name}' not found")
+                    stats['error'] += 1
+                    continue
+                state = str(row['State']).strip().lower()
+                if state not in ['draft', 'confirmed', 'cancelled']:
+                    state = 'confirmed'
+                existing = self.env['lunch.record'].search([
+                    ('employee_id', '=', employee.id),
+                    ('date', '=', date_obj),
+                    ('state', '!=', 'cancelled'),
+                ], limit=1)
+                vals = {'lunch_type': lunch_type.id, 'state': state, 'note': row.get('Remarks', '') or ''}
+                if existing:
+                    existing.sudo().write(vals)
+                else:
+                    self.env['lunch.record'].sudo().create(dict(vals, employee_id=employee.id, date=date_obj))
+                stats['success'] += 1
+            except Exception as e:
+                stats['messages'].append(f"Row {index + 2}: {str(e)}")
+                stats['error'] += 1
+        return stats
+
+    def _run_import(self, importer, df):
+        """Run ``importer`` on ``df``, return its stats and the resulting
+        records, then roll the import back"""
+        self.env.flush_all()
+        self.env.cr.execute("SAVEPOINT lunch_import_compare")
+        try:
+            stats = importer(df)
+            self.env.flush_all()
+            records = self.env['lunch.record'].search([('employee_id', 'in', self.employees.ids)])
+            snapshot = sorted(
+                (record.employee_id.name, record.date, record.lunch_type.lunch_type, record.state, record.note or '')
+                for record in records
+            )
+        finally:
+            self.env.cr.execute("ROLLBACK TO SAVEPOINT lunch_import_compare")
+            self.env.invalidate_all()
+        return stats, snapshot
+
+    def assertSameImport(self, rows):
+        df = pd.DataFrame(rows, columns=['Employee Name', 'Date', 'Lunch Type', 'State', 'Remarks'])
+        expected_stats, expected_records = self._run_import(self._import_row_by_row, df)
+        stats, records = self._run_import(self.env['lunch.excel.import']._import_dataframe, df)
+        self.assertEqual(records, expected_records)
+        self.assertEqual(
+            (stats['success'], stats['error'], stats['skipped'], stats['messages']),
+            (expected_stats['success'], expected_stats['error'], expected_stats['skipped'],
+             expected_stats['messages']),
+        )
+        return stats, records
+
+    def test_duplicate_keys(self):
+        stats, records = self.assertSameImport([
+            ('Import Jane Smith', '2025-01-07', 'Veg', 'draft', 'first'),
+            ('import jane smith', '2025-01-07', 'Non-Veg', 'confirmed', 'second'),
+            ('Import Jane Smith', '2025-01-06', 'Non-Veg', 'confirmed', 'update'),
+            ('IMPORT JANE SMITH', '2025-01-06', 'Veg', 'draft', 'update again'),
+        ])
+        self.assertEqual(stats['success'], 4)
+        self.assertIn(('Import Jane Smith', TUESDAY, 'Non-Veg', 'confirmed', 'second'), records)
+
+    def test_cancel_then_recreate(self):
+        stats, records = self.assertSameImport([
+            ('Import John Doe', '2025-01-06', 'Veg', 'cancelled', 'cancel'),
+            ('Import John Doe', '2025-01-06', 'Non-Veg', 'confirmed', 'recreate'),
+            ('Import John Doe', '2025-01-07', 'Veg', 'cancelled', 'new cancelled'),
+            ('Import John Doe', '2025-01-07', 'Veg', 'draft', 'new draft'),
+        ])
+        self.assertEqual(stats['success'], 4)
+        self.assertEqual(len([r for r in records if r[0] == 'Import John Doe' and r[1] == MONDAY]), 2)
+
+    def test_saturday_skipped(self):
+        stats, records = self.assertSameImport([
+            ('Import John Doe', SATURDAY.isoformat(), 'Veg', 'confirmed', ''),
+            ('Import Jane Smith', '2025-01-11', 'Unknown Type', 'confirmed', ''),
+            ('Import Jane Smith', '2025-01-07', 'Veg', 'confirmed', ''),
+        ])
+        self.assertEqual((stats['success'], stats['skipped']), (1, 2))
+        self.assertFalse([r for r in records if r[1] == SATURDAY])
+
+    def test_unknown_names(self):
+        stats, _records = self.assertSameImport([
+            ('Nobody', '2025-01-07', 'Veg', 'confirmed', ''),
+            ('Import John Doe', '2025-01-07', 'Vegan', 'confirmed', ''),
+            ('Import John Doe', 'not a date', 'Veg', 'confirmed', ''),
+            ('Import Jane Smith', '2025-01-07', 'Veg', 'confirmed', ''),
+        ])
+        self.assertEqual((stats['success'], stats['error']), (1, 3))
+
+    def test_wildcard_names(self):
+        # The row-by-row lookup used the names as =ilike patterns
+        stats, records = self.assertSameImport([
+            ('Import J_hn Doe', '2025-01-07', 'Veg', 'confirmed', ''),
+            ('Import % Ann', '2025-01-07', 'V%', 'confirmed', ''),
+            ('Import 100% Ann', '2025-01-07', 'N_n-Veg', 'draft', 'pattern type'),
+            ('Import Nob_dy', '2025-01-07', 'Veg', 'confirmed', ''),
+        ])
+        self.assertEqual((stats['success'], stats['error']), (3, 1))
+        self.assertIn(('Import John Doe', TUESDAY, 'Veg', 'confirmed', ''), records)
\ No newline at end of file
@@ -0,0 +1,120 @@
+import logging
+import statistics
+from datetime import date, timedelta
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('-standard', '-at_install', 'post_install', 'lunch_benchmark')
+class TestLunchRecordIndexBenchmark(TransactionCase):
+    """Query plans and timings of the lunch.record access patterns on a
+    generated dataset, without and with the module's indexes.
+
+    Not part of the standard test run, use:
+        odoo-bin -d <db> -i 19_lunch_management --test-tags lunch_benchmark
+    """
+
+    N_EMPLOYEES = 500
+    N_DAYS = 730
+    RUNS = 5
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lunch_type = cls.env['lunch.types'].create({'lunch_type': 'Benchmark', 'cost': 100.0})
+        users = cls.env['res.users'].with_context(no_reset_password=True).create([
+            {'name': f'Benchmark User {i}', 'login': f'lunch_benchmark_{i}'} for i in range(cls.N_EMPLOYEES)
+        ])
+        cls.employees = cls.env['hr.employee'].create([
+            {'name': f'Benchmark Employee {i}', 'user_id': user.id} for i, user in enumerate(users)
+        ])
+        cls.date_to = date.today()
+        cls.date_from = cls.date_to - timedelta(days=cls.N_DAYS)
+
+        cls.env.flush_all()
+
+        # One record per employee and working day, states spread over the workflow
+        cls.env.cr.execute(SQL("""
+            INSERT INTO lunch_record (employee_id, user_id, date, day, name, lunch_type, cost, state,
+                                      is_admin_request, create_uid, create_date, write_uid, write_date)
+                 SELECT e.id, e.user_id, d::date, to_char(d, 'FMDay'), 'Benchmark', %(type)s, 100.0,
+                        (ARRAY['confirmed', 'confirmed', 'confirmed', 'draft', 'cancelled', 'requested'])
+                            [1 + (e.id + extract(doy FROM d)::int) %% 6],
+                        false, %(uid)s, now(), %(uid)s, now()
+                   FROM hr_employee e,
+                        generate_series(%(date_from)s::date, %(date_to)s::date, '1 day') AS d
+                  WHERE e.id = ANY(%(employees)s) AND extract(isodow FROM d) != 6
+        """, type=cls.lunch_type.id, uid=cls.env.uid, employees=cls.employees.ids,
+            date_from=cls.date_from, date_to=cls.date_to))
+        cls.env.cr.execute("ANALYZE lunch_record")
+
+    def _access_patterns(self):
+        Record = self.env['lunch.record']
+        month_start = self.date_to.replace(day=1)
+        employee = self.employees[len(self.employees) // 2]
+        return {
+            'report: month, confirmed': Record._search(
+                [('date', '>=', month_start), ('date', '<=', self.date_to), ('state', '=', 'confirmed')],
+                order='date desc'),
+            'all records: today': Record._search([('date', '=', self.date_to)], order='date desc'),
+            'my records: one employee': Record._search(
+                [('employee_id', '=', employee.id)], order='date desc', limit=80),
+            'my records: one user': Record._search(
+                [('user_id', '=', employee.user_id.id)], order='date desc', limit=80),
+            'employee report: one employee, month': Record._search(
+                [('employee_id', '=', employee.id), ('date', '>=', month_start), ('date', '<=', self.date_to)],
+                order='date desc'),
+            'requested queue': Record._search([('state', '=', 'requested')], order='date desc', limit=80),
+        }
+
+    def _explain(self, query):
+        self.env.cr.execute(SQL("EXPLAIN (ANALYZE, FORMAT JSON) %s", query.select()))
+        return self.env.cr.fetchone()[0][0]
+
+    def _measure(self):
+        results = {}
+        for label, query in self._access_patterns().items():
+            plans = [self._explain(query) for _run in range(self.RUNS)]
+            results[label] = (
+                statistics.median(plan['Execution Time'] for plan in plans),
+                plans[-1]['Plan'],
+            )
+        return results
+
+    @staticmethod
+    def _plan_nodes(plan):
+        nodes = [plan['Node Type'] + (f" using {plan['Index Name']}" if 'Index Name' in plan else '')]
+        for child in plan.get('Plans', []):
+            nodes += TestLunchRecordIndexBenchmark._plan_nodes(child)
+        return ' > '.join(nodes)
+
+    def test_index_benchmark(self):
+        self.env.cr.execute("""
+            SELECT indexname FROM pg_indexes
+             WHERE tablename = 'lunch_record' AND indexname NOT LIKE '%pkey'
+        """)
+        index_names = [row[0] for row in self.env.cr.fetchall()]
+
+        # "Before": every secondary index dropped, restored by the rollback
+        self.env.cr.execute("SAVEPOINT lunch_index_benchmark")
+        for index_name in index_names:
+            self.env.cr.execute(SQL("DROP INDEX %s", SQL.identifier(index_name)))
+        before = self._measure()
+        self.env.cr.execute("ROLLBACK TO SAVEPOINT lunch_index_benchmark")
+        after = self._measure()
+
+        lines = [f"lunch.record index benchmark ({self.N_EMPLOYEES} employees x {self.N_DAYS} days)"]
+        for label, (before_ms, before_plan) in before.items():
+            after_ms, after_plan = after[label]
+            lines += [
+                f"  {label}: {before_ms:.2f} ms -> {after_ms:.2f} ms",
+                f"    before: {self._plan_nodes(before_plan)}",
+                f"    after:  {self._plan_nodes(after_plan)}",
+            ]
+        _logger.info("\n".join(lines))
+
+        self.assertNotIn('Seq Scan', self._plan_nodes(after['requested queue'][1]),
+                         "The requested queue should be served by the partial index")